@@ -0,0 +1,491 @@
+"""
+Benchmark suite for the faculty stress detector.
+Usage: python integration/benchmark_suite.py [benchmark ...]
+Runs every benchmark when none is named.
+"""
+
+import io
+import os
+import sys
+import time
+import pickle
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import f1_score
+from sklearn.model_selection import train_test_split
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ml_component.stress_predictor import FacultyStressPredictor
+from ml_component.generate_dataset import generate_records
+from ml_component.rebalancing import rebalance_department
+from ml_component.scenarios import scenario_grid, simulate_scenarios
+from ml_component.model_backends import MODEL_BACKENDS, make_model, fit_model
+from ml_component.training_data import WEIGHT_COLUMN, collapse_duplicates, balanced_weights
+from ml_component.training_data import summarize_training_file
+from ml_component.aggregate_cube import AggregateCube
+from ml_component.tenant_pool import TenantPool
+from ml_component.incremental import incremental_score
+from ml_component.wss import FEATURE_NAMES, wss_scores, stress_levels
+from ml_component.validation import validate_records
+from report_renderer import write_reports
+from results_writer import pyarrow_available, write_results, read_results, dataset_size
+
+
+def print_header(title):
+    """Print a benchmark section header."""
+    print("\n" + "=" * 60)
+    print(title)
+    print("=" * 60)
+
+
+def benchmark_rebalancing(sizes=(50, 100, 200, 400, 800), repeats=3):
+    """Solve time of the department rebalancing solver against department size."""
+    print_header("Department Rebalancing: Solve Time vs Department Size")
+    predictor = FacultyStressPredictor()
+
+    print(f"{'Size':>6} {'Moves':>7} {'High before':>12} {'High after':>11} "
+          f"{'WSS before':>11} {'WSS after':>10} {'Best (s)':>9}")
+    print("-" * 72)
+    for size in sizes:
+        df = generate_records(size, seed=size)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = rebalance_department(predictor, df)
+            timings.append(time.perf_counter() - start)
+        print(f"{size:>6} {result['iterations']:>7} {result['before']['high_count']:>12} "
+              f"{result['after']['high_count']:>11} {result['before']['total_wss']:>11} "
+              f"{result['after']['total_wss']:>10} {min(timings):>9.3f}")
+
+
+def benchmark_scenarios(populations=(500, 5_000, 50_000), model_populations=(500, 5_000)):
+    """What-if simulation time for a grid of thousands of scenarios vs population size."""
+    print_header("What-If Scenarios: Time vs Population Size")
+    scenarios = scenario_grid({
+        'meeting_hours': [{}, {'max': 12}, {'max': 9}, {'max': 6}, {'max': 3}],
+        'sleep_hours': [{}, {'add': 1}, {'min': 7}],
+        'subjects_handled': [{}, {'max': 4}, {'max': 3}],
+        'admin_tasks': [{}, {'add': -1, 'min': 0}, {'max': 1}],
+        'committee_duties': [{}, {'max': 2}, {'max': 1}],
+        'weekend_work': [{}, {'max': 1}, {'max': 0}],
+        'prep_hours': [{}, {'max': 10}],
+    })
+    wss_only = FacultyStressPredictor()
+    with_model = FacultyStressPredictor()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with_model.train_model(labelled_records(5000))
+    print(f"{len(scenarios):,} scenarios\n")
+
+    print(f"{'Scoring':<14} {'Population':>11} {'Scenario rows':>14} {'Time (s)':>9} {'rows/s':>13}")
+    print("-" * 65)
+    for label, predictor, sizes in [('WSS only', wss_only, populations),
+                                    ('WSS + forest', with_model, model_populations)]:
+        for size in sizes:
+            df = generate_records(size, seed=size, with_ids=False)
+            start = time.perf_counter()
+            simulate_scenarios(predictor, df, scenarios)
+            seconds = time.perf_counter() - start
+            total = len(scenarios) * size
+            print(f"{label:<14} {size:>11,} {total:>14,} {seconds:>9.2f} {total / seconds:>13,.0f}")
+
+
+def labelled_records(rows, seed=42):
+    """Synthetic records with their WSS stress level as the label."""
+    df = generate_records(rows, seed=seed, with_ids=False)
+    df['stress_level'] = stress_levels(wss_scores(df))
+    return df
+
+
+def benchmark_validation(rows=3_000_000, bad_share=0.01, repeats=3):
+    """Column-wise validation time against WSS-only scoring of the same rows."""
+    print_header("Input Validation: Overhead vs Scoring")
+    predictor = FacultyStressPredictor()
+    clean = generate_records(rows, seed=13, with_ids=False)
+
+    # As read from a spreadsheet with gaps: float columns, some rows invalid
+    values = np.array(clean[FEATURE_NAMES], dtype=np.float64)
+    rng = np.random.default_rng(13)
+    bad_rows = rng.choice(rows, size=int(rows * bad_share), replace=False)
+    columns = rng.integers(0, len(FEATURE_NAMES), size=len(bad_rows))
+    values[bad_rows, columns] = rng.choice([np.nan, -1.0, 2.5, 999.0], size=len(bad_rows))
+    dirty = pd.DataFrame(values, columns=FEATURE_NAMES)
+
+    def best_of(fn):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings), result
+
+    score_seconds, _ = best_of(lambda: predictor.score_batch(clean, track_drift=False))
+    print(f"{rows:,} rows; WSS-only scoring: {score_seconds:.3f}s\n")
+    print(f"{'Input':<28} {'Validate (s)':>13} {'vs scoring':>11} {'Quarantined':>12}")
+    print("-" * 68)
+    for label, df, expected in [('clean int64', clean, 0),
+                                (f'float, {bad_share:.0%} invalid', dirty, len(bad_rows))]:
+        seconds, (_, quarantined, _) = best_of(lambda: validate_records(df))
+        status = "" if len(quarantined) == expected else " [FAILED]"
+        print(f"{label:<28} {seconds:>13.3f} {seconds / score_seconds:>10.0%} "
+              f"{len(quarantined):>12,}{status}")
+
+
+def benchmark_backends(rows=50000, batch_rows=100000, latency_calls=200):
+    """Accuracy, latency, throughput, size and training time per model backend."""
+    print_header("Model Backends: Accuracy / Latency / Size Matrix")
+    df = labelled_records(rows)
+    X_train, X_test, y_train, y_test = train_test_split(
+        df[FEATURE_NAMES], df['stress_level'], test_size=0.3, random_state=42,
+        stratify=df['stress_level']
+    )
+    batch = generate_records(batch_rows, seed=7, with_ids=False)
+    single = X_test.iloc[[0]]
+    print(f"Train rows: {len(X_train)}, test rows: {len(X_test)}, batch rows: {batch_rows}\n")
+
+    print(f"{'Backend':<24} {'Macro F1':>9} {'ms/record':>10} {'rows/s':>12} "
+          f"{'Size (KB)':>10} {'Train (s)':>10}")
+    print("-" * 80)
+    for name in MODEL_BACKENDS:
+        model = make_model(name)
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        train_seconds = time.perf_counter() - start
+
+        macro_f1 = f1_score(y_test, model.predict(X_test), average='macro', zero_division=0)
+
+        # Per-record latency: median of single-row predictions
+        timings = []
+        for _ in range(latency_calls):
+            start = time.perf_counter()
+            model.predict(single)
+            timings.append(time.perf_counter() - start)
+        latency_ms = 1000 * float(np.median(timings))
+
+        start = time.perf_counter()
+        model.predict(batch)
+        throughput = batch_rows / (time.perf_counter() - start)
+
+        size_kb = len(pickle.dumps(model)) / 1024
+        print(f"{name:<24} {macro_f1:>9.4f} {latency_ms:>10.3f} {throughput:>12,.0f} "
+              f"{size_kb:>10.1f} {train_seconds:>10.2f}")
+
+
+def repetitive_records(rows, profiles=20000, seed=42):
+    """
+    Labelled records drawn from a fixed pool of workload profiles with
+    Zipf-like frequencies, stored as int16 features and a categorical label.
+    """
+    pool = labelled_records(profiles, seed=seed)
+    rng = np.random.default_rng(seed)
+    popularity = 1.0 / np.arange(1, profiles + 1) ** 1.1
+    picks = rng.choice(profiles, size=rows, p=popularity / popularity.sum())
+    df = pool[FEATURE_NAMES].astype(np.int16).iloc[picks].reset_index(drop=True)
+    df['stress_level'] = pool['stress_level'].astype('category').iloc[picks].to_numpy()
+    return df
+
+
+def benchmark_dedup(rows=10_000_000, profiles=20000, raw_rows=500_000, backend='random_forest'):
+    """Training on collapsed unique profiles vs raw rows on a repetitive dataset."""
+    print_header("Deduplicated Training: Unique Weighted Profiles vs Raw Rows")
+    start = time.perf_counter()
+    df = repetitive_records(rows, profiles)
+    print(f"Generated {rows:,} rows from a pool of {profiles:,} profiles "
+          f"in {time.perf_counter() - start:.1f}s ({df.memory_usage().sum() / 2**20:.0f} MB)")
+    holdout = repetitive_records(100_000, profiles, seed=43)
+
+    start = time.perf_counter()
+    collapsed = collapse_duplicates(df)
+    collapse_seconds = time.perf_counter() - start
+    print(f"Collapsed to {len(collapsed):,} unique rows in {collapse_seconds:.2f}s "
+          f"({collapsed.memory_usage().sum() / 2**20:.1f} MB)\n")
+
+    print(f"{'Mode':<28} {'Train rows':>11} {'Represents':>12} {'Train (s)':>10} {'Macro F1':>9}")
+    print("-" * 74)
+
+    # Deduplicated: every row represented through its weight
+    weights = collapsed[WEIGHT_COLUMN].to_numpy()
+    model = make_model(backend, class_weight=None)
+    start = time.perf_counter()
+    fit_model(model, collapsed[FEATURE_NAMES], collapsed['stress_level'],
+              balanced_weights(collapsed['stress_level'], weights))
+    dedup_seconds = time.perf_counter() - start
+    macro_f1 = f1_score(holdout['stress_level'], model.predict(holdout[FEATURE_NAMES]),
+                        average='macro', zero_division=0)
+    print(f"{'dedup (weighted)':<28} {len(collapsed):>11,} {int(weights.sum()):>12,} "
+          f"{dedup_seconds + collapse_seconds:>10.2f} {macro_f1:>9.4f}")
+
+    # Raw rows: full data is impractical for the forest, so time a subsample
+    sample = df.sample(n=min(raw_rows, rows), random_state=42)
+    model = make_model(backend)
+    start = time.perf_counter()
+    model.fit(sample[FEATURE_NAMES], sample['stress_level'])
+    raw_seconds = time.perf_counter() - start
+    macro_f1 = f1_score(holdout['stress_level'], model.predict(holdout[FEATURE_NAMES]),
+                        average='macro', zero_division=0)
+    print(f"{'raw subsample':<28} {len(sample):>11,} {len(sample):>12,} "
+          f"{raw_seconds:>10.2f} {macro_f1:>9.4f}")
+    print(f"\nEstimated raw training on all {rows:,} rows: "
+          f"~{raw_seconds * rows / len(sample):,.0f}s (linear extrapolation)")
+
+
+def benchmark_streaming(rows=5_000_000, profiles=50_000, chunksize=250_000, per_class=50_000):
+    """Out-of-core training from a CSV file: time and peak memory per method."""
+    print_header("Streaming Training: Chunked Summaries vs Full Load")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'archive.csv')
+        start = time.perf_counter()
+        for offset in range(0, rows, 1_000_000):
+            part = repetitive_records(min(1_000_000, rows - offset), profiles, seed=offset)
+            part[FEATURE_NAMES].to_csv(path, mode='a', header=offset == 0, index=False)
+        print(f"Wrote {rows:,} rows ({os.path.getsize(path) / 2**20:.0f} MB CSV) "
+              f"in {time.perf_counter() - start:.1f}s")
+        print("Peak memory is Python/numpy allocations traced with tracemalloc\n")
+
+        print(f"{'Mode':<14} {'Summary rows':>13} {'Summarize (s)':>14} {'Train (s)':>10} "
+              f"{'Peak (MB)':>10}")
+        print("-" * 66)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        df = pd.read_csv(path)
+        df['stress_level'] = stress_levels(wss_scores(df))
+        load_seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{'full load':<14} {len(df):>13,} {load_seconds:>14.2f} {'-':>10} {peak / 2**20:>10.0f}")
+        del df
+
+        for method in ['counts', 'reservoir']:
+            tracemalloc.start()
+            start = time.perf_counter()
+            summary, _ = summarize_training_file(
+                path, method, chunksize, per_class, quarantine_file=os.path.join(tmp, 'q.csv')
+            )
+            summarize_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            predictor = FacultyStressPredictor()
+            with contextlib.redirect_stdout(io.StringIO()):
+                predictor.train_model(summary, deduplicate=True)
+            train_seconds = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{method:<14} {len(summary):>13,} {summarize_seconds:>14.2f} "
+                  f"{train_seconds:>10.2f} {peak / 2**20:>10.0f}")
+
+
+def benchmark_reports(sizes=(1000, 10000, 50000), workers=(1, 8)):
+    """Throughput of bulk personalized report rendering and writing."""
+    print_header("Bulk Report Rendering: Throughput")
+    predictor = FacultyStressPredictor()
+    print(f"{'Records':>8} {'Mode':<10} {'Workers':>8} {'Seconds':>9} {'Reports/s':>11} {'MB':>8}")
+    print("-" * 60)
+    for size in sizes:
+        df = generate_records(size, seed=size)
+        df = df.join(predictor.score_batch(df, track_drift=False))
+        for n_workers in workers:
+            for mode in ['files', 'combined']:
+                with tempfile.TemporaryDirectory() as tmp:
+                    if mode == 'files':
+                        stats = write_reports(df, os.path.join(tmp, 'reports'), workers=n_workers)
+                    else:
+                        stats = write_reports(df, combined_file=os.path.join(tmp, 'reports.txt'),
+                                              workers=n_workers)
+                print(f"{size:>8} {mode:<10} {n_workers:>8} {stats['seconds']:>9.3f} "
+                      f"{stats['reports_per_second']:>11,.0f} {stats['bytes'] / 2**20:>8.1f}")
+
+
+def benchmark_results(rows=2_000_000):
+    """Size and write/scan time of batch results as CSV vs columnar formats."""
+    print_header("Batch Results Output: CSV vs Columnar")
+    if not pyarrow_available():
+        print("Skipped: pyarrow is not installed")
+        return
+    predictor = FacultyStressPredictor()
+    df = generate_records(rows, seed=11)
+    results = predictor.score_batch(df, track_drift=False).reset_index(drop=True)
+    results.insert(0, 'faculty_id', df['faculty_id'].to_numpy())
+    results.insert(0, 'index', np.arange(rows))
+    print(f"{rows:,} result rows\n")
+
+    print(f"{'Output':<20} {'Size (MB)':>10} {'Write (s)':>10} {'Scan level (s)':>15}")
+    print("-" * 58)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'results.csv')
+        start = time.perf_counter()
+        results.to_csv(path, index=False)
+        write_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        pd.read_csv(path, usecols=['stress_level'])
+        scan_seconds = time.perf_counter() - start
+        print(f"{'csv':<20} {os.path.getsize(path) / 2**20:>10.1f} {write_seconds:>10.2f} "
+              f"{scan_seconds:>15.3f}")
+
+        for file_format, compression in [('parquet', None), ('parquet', 'snappy'),
+                                         ('parquet', 'zstd'), ('arrow', 'zstd')]:
+            out_dir = os.path.join(tmp, f"{file_format}-{compression}")
+            start = time.perf_counter()
+            write_results(results, out_dir, source='benchmark', file_format=file_format,
+                          compression=compression)
+            write_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            read_results(out_dir, columns=['stress_level'], file_format=file_format)
+            scan_seconds = time.perf_counter() - start
+            label = f"{file_format} ({compression or 'none'})"
+            print(f"{label:<20} {dataset_size(out_dir) / 2**20:>10.1f} {write_seconds:>10.2f} "
+                  f"{scan_seconds:>15.3f}")
+
+        # Runs of different sizes must share one schema to be read together
+        out_dir = os.path.join(tmp, 'mixed-runs')
+        run_sizes = [100, 1000, 100_000]
+        for day, size in enumerate(run_sizes, start=1):
+            write_results(results.iloc[:size], out_dir, run_date=f"2024-05-0{day}")
+        try:
+            combined = len(read_results(out_dir))
+            first_run = len(read_results(out_dir, run_date='2024-05-01'))
+            status = "OK" if (combined, first_run) == (sum(run_sizes), run_sizes[0]) else "FAILED"
+        except Exception as e:
+            combined, status = 0, f"FAILED: {e}"
+        print(f"\nRuns of {', '.join(f'{n:,}' for n in run_sizes)} rows read back together: "
+              f"{combined:,} rows [{status}]")
+
+
+def benchmark_cube(rows=5_000_000, queries=2000):
+    """Cohort query latency from the aggregate cube vs re-scanning records."""
+    print_header("Aggregate Cube: Cohort Query Latency")
+    df = labelled_records(rows)
+    start = time.perf_counter()
+    cube = AggregateCube.from_records(df, df['stress_level'])
+    build_seconds = time.perf_counter() - start
+    print(f"{rows:,} records, cube built in {build_seconds:.2f}s "
+          f"({cube.counts.size:,} cells, {cube.counts.nbytes / 1024:.0f} KB)\n")
+
+    # High share among faculty with 5+ subjects and under 6h sleep
+    start = time.perf_counter()
+    mask = (df['subjects_handled'] >= 5) & (df['sleep_hours'] < 6)
+    scan_share = (df.loc[mask, 'stress_level'] == 'High').mean()
+    scan_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(queries):
+        cube_share = cube.share('High', subjects_handled=3, sleep_hours=3)
+    cube_seconds = (time.perf_counter() - start) / queries
+
+    print(f"{'Method':<12} {'High share':>11} {'Latency (us)':>13}")
+    print("-" * 38)
+    print(f"{'scan':<12} {scan_share:>11.4f} {scan_seconds * 1e6:>13,.0f}")
+    print(f"{'cube':<12} {cube_share:>11.4f} {cube_seconds * 1e6:>13,.1f}")
+
+
+def benchmark_tenants(tenants=36, rows=1_000_000, batches=20, cache_fractions=(0.25, 0.5, 1.5)):
+    """Multi-tenant batch scoring: throughput, cache hit rate and evictions."""
+    print_header("Multi-Tenant Predictor Pool: Cache Behaviour")
+    rng = np.random.default_rng(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        setup = TenantPool(tmp)
+        sizes = []
+        for t in range(tenants):
+            tenant_id = f"inst{t:02d}"
+            low_max = int(rng.integers(12, 16))
+            setup.save_policy(tenant_id, low_max=low_max, medium_max=low_max + 6,
+                              backend='random_forest')
+            predictor = setup.load_tenant(tenant_id)
+            with contextlib.redirect_stdout(io.StringIO()):
+                predictor.train_model(labelled_records(2000, seed=t))
+            setup.registry(tenant_id).promote(setup.registry(tenant_id).register(predictor))
+            sizes.append(len(predictor.artifact_bytes()))
+        print(f"{tenants} tenants, models {np.mean(sizes) / 1024:.0f} KB on average "
+              f"({sum(sizes) / 2**20:.1f} MB in total)")
+
+        df = generate_records(rows, seed=9, with_ids=False)
+        # Skewed traffic: a few large institutions, many small ones
+        popularity = 1.0 / np.arange(1, tenants + 1)
+        df['tenant_id'] = np.array([f"inst{t:02d}" for t in range(tenants)])[
+            rng.choice(tenants, size=rows, p=popularity / popularity.sum())]
+        batch_rows = rows // batches
+        print(f"{rows:,} rows in {batches} batches")
+
+        print("Cache size is a fraction of the total model size\n")
+        print(f"{'Cache (MB)':>10} {'rows/s':>12} {'Hit rate':>9} {'Misses':>7} "
+              f"{'Evictions':>10} {'Resident':>9}")
+        print("-" * 62)
+        for fraction in cache_fractions:
+            mb = fraction * sum(sizes) / 2**20
+            pool = TenantPool(tmp, max_bytes=int(mb * 2**20))
+            start = time.perf_counter()
+            for b in range(batches):
+                pool.score_batch(df.iloc[b * batch_rows:(b + 1) * batch_rows])
+            seconds = time.perf_counter() - start
+            stats = pool.cache_stats()
+            print(f"{mb:>10.1f} {rows / seconds:>12,.0f} {stats['hit_rate']:>9.1%} "
+                  f"{stats['misses']:>7} {stats['evictions']:>10} {len(stats['resident']):>9}")
+
+
+def benchmark_incremental(rows=1_000_000, changed=0.01):
+    """Incremental re-scoring time, and a check that version changes rescore everything."""
+    print_header("Incremental Scoring: Full vs Changed-Only Re-score")
+    predictor = FacultyStressPredictor()
+    df = generate_records(rows, seed=21)
+    start = time.perf_counter()
+    previous, _ = incremental_score(predictor, df)
+    full_seconds = time.perf_counter() - start
+
+    updated = df.copy()
+    touched = np.random.default_rng(21).choice(rows, size=int(rows * changed), replace=False)
+    updated.iloc[touched, updated.columns.get_loc('sleep_hours')] = 4
+    start = time.perf_counter()
+    _, stats = incremental_score(predictor, updated, previous)
+    incremental_seconds = time.perf_counter() - start
+    print(f"Full score: {full_seconds:.2f}s; {changed:.0%} changed: {incremental_seconds:.2f}s "
+          f"({stats['rescored']:,} rescored, {stats['carried_forward']:,} carried forward)")
+
+    # A new model or WSS policy must invalidate every stored result
+    for label, scorer in [('model version', FacultyStressPredictor()),
+                          ('cut-offs', FacultyStressPredictor(low_max=18, medium_max=24))]:
+        if label == 'model version':
+            scorer.model_version = 'benchmark-check'
+        _, stats = incremental_score(scorer, df, previous)
+        status = "OK" if stats['rescored'] == rows else "FAILED"
+        print(f"Changed {label}: {stats['rescored']:,} of {rows:,} rescored [{status}]")
+
+
+BENCHMARKS = {
+    'validation': benchmark_validation,
+    'rebalancing': benchmark_rebalancing,
+    'scenarios': benchmark_scenarios,
+    'backends': benchmark_backends,
+    'dedup': benchmark_dedup,
+    'streaming': benchmark_streaming,
+    'reports': benchmark_reports,
+    'results': benchmark_results,
+    'cube': benchmark_cube,
+    'tenants': benchmark_tenants,
+    'incremental': benchmark_incremental,
+}
+
+
+def main():
+    """Run the selected benchmarks."""
+    parser = argparse.ArgumentParser(description="Faculty stress detector benchmarks")
+    parser.add_argument('benchmarks', nargs='*',
+                        help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    args = parser.parse_args()
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    for name in args.benchmarks or list(BENCHMARKS):
+        BENCHMARKS[name]()
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+Drop-directory ingest daemon.
+Watches a directory that other systems (e.g. the HR export) write workload
+files into, claims each new file atomically, streams it through
+validation, scoring and result writing, and records finished files in a
+checkpoint so a restart does not rescore them.
+
+Usage: python integration/ingest_daemon.py [--watch-dir DIR] [--once]
+
+Layout under the watch directory:
+    <watch>/*.csv, *.xlsx      new files (write elsewhere, then rename in)
+    <watch>/.processing/       files claimed by a worker
+    <watch>/.done/             finished files
+    <watch>/.failed/           files that could not be processed
+    <watch>/.checkpoint.jsonl  finished files and their results, one line each
+
+A claimed file is renamed to <claim id>-<file name>, so an export dropped
+again under the same name never replaces one still being processed.
+Results are written to <output-dir>/<claim id>-<file name>.scored.csv.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ml_component.training_data import read_chunks
+from ml_component.validation import resolve_columns, validate_records, write_quarantine
+from ml_component.model_registry import ModelRegistry
+
+
+DEFAULT_WATCH_DIR = 'integration/inbox'
+DEFAULT_OUTPUT_DIR = 'integration/ingested'
+INGEST_SUFFIXES = ('.csv', '.csv.gz', '.xlsx')
+
+
+def file_key(name, stat):
+    """Identify a file version by name, size and modification time."""
+    return f"{name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def claimed_name(name):
+    """Unique name for a claimed file: '<claim id>-<file name>'."""
+    return f"{uuid.uuid4().hex[:12]}-{name}"
+
+
+def original_name(claimed):
+    """Recover the dropped file's name from a claimed file's name."""
+    return claimed.split('-', 1)[1] if '-' in claimed else claimed
+
+
+class IngestDaemon:
+    """Claims files from a drop directory and scores them with a bounded worker pool."""
+
+    def __init__(self, predictor, watch_dir=DEFAULT_WATCH_DIR, output_dir=DEFAULT_OUTPUT_DIR,
+                 workers=4, queue_size=8, poll_interval=2.0, settle_seconds=1.0,
+                 chunksize=100_000, registry=None):
+        """
+        Args:
+            predictor: FacultyStressPredictor used for scoring.
+            watch_dir: Directory to watch for new files.
+            output_dir: Directory for the scored results.
+            workers: Number of files processed concurrently.
+            queue_size: Claimed files waiting for a worker. When the queue is
+                full the poller stops claiming, so files stay in the watch
+                directory (backpressure).
+            poll_interval: Seconds between directory scans.
+            settle_seconds: Ignore files modified more recently than this,
+                in case a producer is still writing them in place.
+            chunksize: Rows read per chunk of a CSV file.
+            registry: Optional ModelRegistry; the predictor is hot-swapped
+                to the promoted version between scans.
+        """
+        self.predictor = predictor
+        self.watch_dir = watch_dir
+        self.output_dir = output_dir
+        self.workers = workers
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.chunksize = chunksize
+        self.registry = registry
+
+        self.processing_dir = os.path.join(watch_dir, '.processing')
+        self.done_dir = os.path.join(watch_dir, '.done')
+        self.failed_dir = os.path.join(watch_dir, '.failed')
+        self.checkpoint_file = os.path.join(watch_dir, '.checkpoint.jsonl')
+        for directory in [self.watch_dir, self.processing_dir, self.done_dir,
+                          self.failed_dir, self.output_dir]:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.checkpoint = self._load_checkpoint()
+        self.started = time.time()
+        self.stats = {'files_done': 0, 'files_failed': 0, 'files_skipped': 0,
+                      'rows': 0, 'quarantined': 0, 'busy_seconds': 0.0}
+        self.lags = []
+        self._queue = None
+
+    def _load_checkpoint(self):
+        checkpoint = {}
+        if not os.path.exists(self.checkpoint_file):
+            return checkpoint
+        with open(self.checkpoint_file) as f:
+            lines = f.readlines()
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by a crash; that file is rescored
+                continue
+            checkpoint[entry.pop('key')] = entry
+        if lines and not lines[-1].endswith("\n"):
+            # Terminate the cut-short line so the next entry starts cleanly
+            with open(self.checkpoint_file, 'a') as f:
+                f.write("\n")
+        return checkpoint
+
+    def _record(self, key, entry):
+        """Append a finished file to the checkpoint log (one line per file)."""
+        line = json.dumps(dict(entry, key=key)) + "\n"
+        with self._lock:
+            self.checkpoint[key] = entry
+            with open(self.checkpoint_file, 'a') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _move(self, path, directory, name=None):
+        target = os.path.join(directory, name or os.path.basename(path))
+        os.replace(path, target)
+        return target
+
+    def recover(self):
+        """
+        Handle files left in .processing by a previous run: finished ones
+        (in the checkpoint) are moved to .done, the rest keep their claim.
+
+        Returns:
+            List of the unfinished claims, to be processed again.
+        """
+        unfinished = []
+        for claimed in sorted(os.listdir(self.processing_dir)):
+            path = os.path.join(self.processing_dir, claimed)
+            name = original_name(claimed)
+            stat = os.stat(path)
+            key = file_key(name, stat)
+            if key in self.checkpoint:
+                self._move(path, self.done_dir)
+            else:
+                unfinished.append({'key': key, 'name': name, 'path': path, 'arrived': stat.st_mtime})
+                print(f"Re-queued unfinished file: {name}")
+        return unfinished
+
+    def _new_files(self):
+        """Files ready to claim, oldest first."""
+        now = time.time()
+        candidates = []
+        with os.scandir(self.watch_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.startswith('.') \
+                        or not entry.name.lower().endswith(INGEST_SUFFIXES):
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime >= self.settle_seconds:
+                    candidates.append((stat.st_mtime, entry.name, stat))
+        return sorted(candidates)
+
+    def claim(self, name, stat):
+        """
+        Atomically move a file into .processing. Returns the claimed file's
+        info, or None if another process claimed it first or it was already
+        finished.
+        """
+        key = file_key(name, stat)
+        source = os.path.join(self.watch_dir, name)
+        if key in self.checkpoint:
+            # Already scored (e.g. the same export dropped again)
+            try:
+                self._move(source, self.done_dir, claimed_name(name))
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                self.stats['files_skipped'] += 1
+            return None
+        try:
+            path = self._move(source, self.processing_dir, claimed_name(name))
+        except FileNotFoundError:
+            return None
+        return {'key': key, 'name': name, 'path': path, 'arrived': stat.st_mtime}
+
+    def process_file(self, claimed):
+        """Stream one claimed file through validation, scoring and writing."""
+        start = time.time()
+        name = claimed['name']
+        output_file = os.path.join(self.output_dir, f"{os.path.basename(claimed['path'])}.scored.csv")
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, prefix='.tmp-')
+        os.close(fd)
+
+        rows = quarantined_rows = 0
+        column_map = None
+        try:
+            for chunk in read_chunks(claimed['path'], self.chunksize):
+                if column_map is None:
+                    column_map = resolve_columns(chunk.columns)
+                chunk = chunk[list(column_map)].rename(columns=column_map)
+                valid, quarantined, _ = validate_records(chunk)
+                if len(quarantined):
+                    with self._lock:
+                        write_quarantine(quarantined, source=name)
+
+                scores = self.predictor.score_batch(valid)
+                scores.insert(0, 'source_row', valid.index)
+                if 'faculty_id' in valid.columns:
+                    scores.insert(0, 'faculty_id', valid['faculty_id'].astype(str))
+                scores.to_csv(tmp_path, mode='a', header=os.path.getsize(tmp_path) == 0, index=False)
+
+                rows += len(valid)
+                quarantined_rows += len(quarantined)
+            # Results become visible only once the whole file is scored
+            os.replace(tmp_path, output_file)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        finished = time.time()
+        self._record(claimed['key'], {
+            'name': name,
+            'rows': rows,
+            'quarantined': quarantined_rows,
+            'output': output_file,
+            'model_version': self.predictor.model_version,
+            'finished_at': datetime.fromtimestamp(finished, timezone.utc).isoformat(),
+        })
+        self._move(claimed['path'], self.done_dir)
+
+        lag = finished - claimed['arrived']
+        with self._lock:
+            self.stats['files_done'] += 1
+            self.stats['rows'] += rows
+            self.stats['quarantined'] += quarantined_rows
+            self.stats['busy_seconds'] += finished - start
+            self.lags.append(lag)
+        print(f"+ {name}: {rows} rows scored ({quarantined_rows} quarantined) "
+              f"in {finished - start:.2f}s, lag {lag:.1f}s")
+
+    def _fail(self, claimed, error):
+        try:
+            self._move(claimed['path'], self.failed_dir)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self.stats['files_failed'] += 1
+        print(f"Error: {claimed['name']} failed and was moved to {self.failed_dir}: {error}")
+
+    async def _worker(self, queue, executor):
+        loop = asyncio.get_running_loop()
+        while True:
+            claimed = await queue.get()
+            try:
+                await loop.run_in_executor(executor, self.process_file, claimed)
+            except Exception as e:
+                self._fail(claimed, e)
+            finally:
+                queue.task_done()
+
+    async def run(self, once=False):
+        """
+        Watch the directory until cancelled (or, with once=True, until the
+        files present at start-up are processed).
+        """
+        unfinished = self.recover()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._queue = queue
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        workers = [asyncio.create_task(self._worker(queue, executor)) for _ in range(self.workers)]
+        try:
+            for claimed in unfinished:
+                await queue.put(claimed)
+            while True:
+                if self.registry is not None and self.registry.sync(self.predictor):
+                    print(f"+ Switched to model {self.predictor.model_version}")
+                for _, name, stat in self._new_files():
+                    claimed = self.claim(name, stat)
+                    if claimed is not None:
+                        # Waits while the queue is full
+                        await queue.put(claimed)
+                if once:
+                    break
+                await asyncio.sleep(self.poll_interval)
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            executor.shutdown(wait=True)
+
+    def metrics(self):
+        """
+        Return ingest metrics: file and row counts, throughput (rows per
+        second of wall time and of worker busy time), ingest lag (seconds
+        from a file's arrival to its results being written) and queue depth.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            lags = list(self.lags)
+        elapsed = time.time() - self.started
+        stats.update({
+            'elapsed_seconds': elapsed,
+            'rows_per_second': stats['rows'] / elapsed if elapsed > 0 else 0.0,
+            'rows_per_busy_second': stats['rows'] / stats['busy_seconds']
+                                    if stats['busy_seconds'] > 0 else 0.0,
+            'lag_mean_seconds': sum(lags) / len(lags) if lags else 0.0,
+            'lag_max_seconds': max(lags) if lags else 0.0,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+        })
+        return stats
+
+
+def print_metrics(metrics):
+    """Print daemon metrics."""
+    print("\n" + "=" * 60)
+    print("INGEST METRICS")
+    print("=" * 60)
+    print(f"Files: {metrics['files_done']} done, {metrics['files_failed']} failed, "
+          f"{metrics['files_skipped']} already scored")
+    print(f"Rows: {metrics['rows']} scored, {metrics['quarantined']} quarantined")
+    print(f"Throughput: {metrics['rows_per_second']:,.0f} rows/s "
+          f"({metrics['rows_per_busy_second']:,.0f} rows/s per busy worker)")
+    print(f"Ingest lag: mean {metrics['lag_mean_seconds']:.1f}s, "
+          f"max {metrics['lag_max_seconds']:.1f}s")
+
+
+def main():
+    """Run the ingest daemon."""
+    parser = argparse.ArgumentParser(description="Faculty workload drop-directory ingest daemon")
+    parser.add_argument('--watch-dir', default=DEFAULT_WATCH_DIR)
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--queue-size', type=int, default=8)
+    parser.add_argument('--poll-interval', type=float, default=2.0)
+    parser.add_argument('--once', action='store_true',
+                        help="Process the files present now, then exit")
+    args = parser.parse_args()
+
+    from run_system import initialize_predictor
+    predictor = initialize_predictor()
+    if predictor is None:
+        print("Failed to initialize predictor. Exiting.")
+        return
+
+    daemon = IngestDaemon(
+        predictor, args.watch_dir, args.output_dir, workers=args.workers,
+        queue_size=args.queue_size, poll_interval=args.poll_interval,
+        registry=ModelRegistry()
+    )
+    print(f"Watching {args.watch_dir} (Ctrl+C to stop)...")
+    try:
+        asyncio.run(daemon.run(once=args.once))
+    except KeyboardInterrupt:
+        pass
+    print_metrics(daemon.metrics())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+Bulk personalized report rendering.
+Renders the wellness recommendations and reasoning of the Prolog expert
+system (generateRecommendations / explainReasoning in main.pro) for every
+scored faculty record at once, instead of one person per interactive run.
+"""
+
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ml_component.wss import FEATURE_NAMES, STRESS_LEVELS, LOW_MAX, MEDIUM_MAX, factor_points
+
+
+DEFAULT_REPORTS_DIR = 'integration/reports'
+
+# Buffer size of the combined report file
+WRITE_BUFFER_BYTES = 1 << 20
+
+RULE = "=" * 60 + "\n"
+
+# Text of generateRecommendations/explainReasoning in main.pro (keep in sync);
+# {wss_range} in REASONING is filled in from the WSS cut-offs
+RECOMMENDATIONS = {
+    'High': (
+        "STRESS LEVEL: HIGH\n"
+        "-----------------\n\n"
+        "IMMEDIATE ACTIONS REQUIRED:\n\n"
+        "1. WORKLOAD ADJUSTMENTS:\n"
+        "   - Request reduction in number of subjects (target: 2-3)\n"
+        "   - Negotiate smaller class sizes or teaching assistant support\n"
+        "   - Delegate administrative tasks where possible\n"
+        "   - Request temporary relief from committee assignments\n\n"
+        "2. WELLNESS BREAKS:\n"
+        "   - Schedule mandatory 15-minute breaks every 2 hours\n"
+        "   - Take a complete day off each week (no work activities)\n"
+        "   - Plan a 3-5 day wellness break within the next month\n"
+        "   - Engage in daily 30-minute physical activity\n\n"
+        "3. TIME MANAGEMENT:\n"
+        "   - Implement time-blocking for core activities\n"
+        "   - Batch similar tasks together (e.g., all grading in one session)\n"
+        "   - Set boundaries for meeting times (max 2 hours/day)\n"
+        "   - Use preparation templates to reduce prep time\n\n"
+        "4. SLEEP AND RECOVERY:\n"
+        "   - Prioritize 7-8 hours of sleep nightly\n"
+        "   - Establish consistent sleep schedule\n"
+        "   - Avoid work activities 2 hours before bedtime\n"
+        "   - Consider consultation with healthcare provider\n\n"
+        "5. INSTITUTIONAL SUPPORT:\n"
+        "   - Schedule meeting with department head to discuss workload\n"
+        "   - Request access to faculty wellness resources\n"
+        "   - Explore options for sabbatical or reduced load\n"
+        "   - Document workload for administrative review\n\n"
+    ),
+    'Medium': (
+        "STRESS LEVEL: MEDIUM\n"
+        "-------------------\n\n"
+        "PREVENTIVE MEASURES RECOMMENDED:\n\n"
+        "1. TIME-BLOCKING STRATEGIES:\n"
+        "   - Allocate specific time blocks for teaching prep (2-3 hours/day)\n"
+        "   - Reserve morning hours for research (when cognitive load is highest)\n"
+        "   - Group administrative tasks in afternoon slots\n"
+        "   - Protect time blocks from interruptions\n\n"
+        "2. WORK CYCLE MONITORING:\n"
+        "   - Track weekly workload distribution\n"
+        "   - Identify peak stress periods and plan accordingly\n"
+        "   - Review workload monthly and adjust commitments\n"
+        "   - Maintain work-life balance boundaries\n\n"
+        "3. EFFICIENCY IMPROVEMENTS:\n"
+        "   - Develop reusable teaching materials\n"
+        "   - Use technology to streamline grading and communication\n"
+        "   - Consolidate meetings when possible\n"
+        "   - Set clear agendas and time limits for meetings\n\n"
+        "4. WELLNESS MAINTENANCE:\n"
+        "   - Maintain 7+ hours of sleep consistently\n"
+        "   - Engage in regular physical activity (3-4 times/week)\n"
+        "   - Practice stress-reduction techniques (meditation, deep breathing)\n"
+        "   - Schedule regular social activities outside work\n\n"
+        "5. PREVENTIVE PLANNING:\n"
+        "   - Plan ahead for busy periods (exam weeks, deadlines)\n"
+        "   - Build buffer time into schedules\n"
+        "   - Learn to say 'no' to additional commitments\n"
+        "   - Regular check-ins with supervisor about workload\n\n"
+    ),
+    'Low': (
+        "STRESS LEVEL: LOW\n"
+        "----------------\n\n"
+        "MAINTAINING OPTIMAL WELLNESS:\n\n"
+        "1. ROUTINE MAINTENANCE:\n"
+        "   - Continue current workload management practices\n"
+        "   - Maintain balanced distribution of responsibilities\n"
+        "   - Keep effective time management habits\n"
+        "   - Preserve work-life balance boundaries\n\n"
+        "2. PREVENTIVE WELLNESS PLANNING:\n"
+        "   - Continue adequate sleep schedule (7+ hours)\n"
+        "   - Maintain regular exercise routine\n"
+        "   - Engage in professional development activities\n"
+        "   - Pursue personal interests and hobbies\n\n"
+        "3. SUSTAINABLE GROWTH:\n"
+        "   - Consider taking on new challenges gradually\n"
+        "   - Mentor colleagues who may be experiencing higher stress\n"
+        "   - Share effective strategies with department\n"
+        "   - Continue monitoring workload to prevent escalation\n\n"
+        "4. LONG-TERM WELLNESS:\n"
+        "   - Regular health check-ups and wellness assessments\n"
+        "   - Continue stress management practices\n"
+        "   - Maintain social connections and support networks\n"
+        "   - Plan for career development and growth opportunities\n\n"
+        "5. INSTITUTIONAL CONTRIBUTION:\n"
+        "   - Participate in faculty wellness initiatives\n"
+        "   - Advocate for workload policies that support all faculty\n"
+        "   - Share best practices for work-life balance\n"
+        "   - Support colleagues in maintaining wellness\n\n"
+    ),
+}
+
+REASONING = {
+    'High': (
+        "Rule Applied: HIGH_STRESS_RULE\n"
+        "Conditions Met:\n"
+        "  - Workload Stress Score (WSS) is {wss_range}\n"
+        "  - Multiple high-intensity factors present\n"
+        "  - Risk of burnout and health issues\n\n"
+        "Conclusion: Immediate intervention required to prevent\n"
+        "deterioration of health and teaching quality. Workload\n"
+        "reduction and wellness breaks are essential.\n\n"
+    ),
+    'Medium': (
+        "Rule Applied: MEDIUM_STRESS_RULE\n"
+        "Conditions Met:\n"
+        "  - Workload Stress Score (WSS) is {wss_range}\n"
+        "  - Moderate workload intensity\n"
+        "  - Some risk factors present but manageable\n\n"
+        "Conclusion: Preventive measures and better time management\n"
+        "can prevent escalation to high stress. Monitoring and\n"
+        "proactive adjustments are recommended.\n\n"
+    ),
+    'Low': (
+        "Rule Applied: LOW_STRESS_RULE\n"
+        "Conditions Met:\n"
+        "  - Workload Stress Score (WSS) is {wss_range}\n"
+        "  - Balanced workload distribution\n"
+        "  - Healthy work-life balance indicators\n\n"
+        "Conclusion: Current practices are effective. Focus on\n"
+        "maintaining routines and preventive wellness planning to\n"
+        "sustain optimal performance and well-being.\n\n"
+    ),
+}
+
+UNKNOWN_LEVEL_TEXT = (
+    "Error: Unknown stress level. Please check the input file.\n"
+    "Reasoning explanation not available for this stress level.\n"
+)
+
+HEADER = (
+    RULE
+    + "PERSONALIZED WELLNESS REPORT\n"
+    + RULE
+    + "Faculty ID: {faculty_id}\n"
+    + "{department}"
+    + "Workload Stress Score (WSS): {wss}\n"
+    + "Stress Level Detected: {stress_level}\n"
+    + "{model_prediction}"
+    + "\n{factors}"
+)
+
+FACTOR_LINE = "  {name:<22} {value:>4}  ({points} pt{plural})\n"
+
+
+def _literal(text):
+    """Escape text so str.format leaves it unchanged."""
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def wss_ranges(low_max=LOW_MAX, medium_max=MEDIUM_MAX):
+    """Return the WSS range text of each stress level, e.g. {'Low': '9-14', ...}."""
+    lowest, highest = len(FEATURE_NAMES), 3 * len(FEATURE_NAMES)
+    return {
+        'Low': f"{lowest}-{low_max}",
+        'Medium': f"{low_max + 1}-{medium_max}",
+        'High': f"{medium_max + 1}-{highest}",
+    }
+
+
+def compile_templates(low_max=LOW_MAX, medium_max=MEDIUM_MAX):
+    """
+    Build one format string per stress level (plus a fallback) with all the
+    static recommendation and reasoning text already joined, so rendering a
+    record is a single str.format call. The reasoning states the WSS range
+    of each level under the given cut-offs.
+    """
+    ranges = wss_ranges(low_max, medium_max)
+    templates = {}
+    for level in STRESS_LEVELS:
+        reasoning = REASONING[level].format(wss_range=ranges[level])
+        templates[level] = (
+            HEADER
+            + _literal(RECOMMENDATIONS[level])
+            + _literal(RULE + "REASONING EXPLANATION\n" + RULE + "\n" + reasoning)
+        )
+    templates[None] = HEADER + _literal(UNKNOWN_LEVEL_TEXT)
+    return templates
+
+
+TEMPLATES = compile_templates()
+
+
+def _factor_blocks(df):
+    """Per-record 'Workload factors' text, or '' when features are absent."""
+    if not all(name in df.columns for name in FEATURE_NAMES):
+        return [''] * len(df)
+    values = df[FEATURE_NAMES].to_numpy()
+    points = factor_points(df[FEATURE_NAMES])
+    # Each (feature, value) line is rendered once and reused
+    cache = {}
+    blocks = []
+    for row_values, row_points in zip(values.tolist(), points.tolist()):
+        lines = ["Workload factors:\n"]
+        for name, value, pts in zip(FEATURE_NAMES, row_values, row_points):
+            line = cache.get((name, value))
+            if line is None:
+                line = FACTOR_LINE.format(name=name, value=value, points=pts,
+                                          plural='' if pts == 1 else 's')
+                cache[(name, value)] = line
+            lines.append(line)
+        lines.append("\n")
+        blocks.append(''.join(lines))
+    return blocks
+
+
+def _record_ids(df):
+    if 'faculty_id' in df.columns:
+        return df['faculty_id'].astype(str).tolist()
+    if 'index' in df.columns:
+        return df['index'].astype(str).tolist()
+    return [str(i) for i in df.index]
+
+
+def render_reports(df, templates=TEMPLATES):
+    """
+    Render one report per record.
+
+    Args:
+        df: Batch scoring results with 'wss' and 'stress_level', and
+            optionally 'faculty_id' (or 'index'), 'department',
+            'model_prediction' and the nine feature columns.
+
+    Returns:
+        (ids, texts): record IDs and report texts, in df order.
+    """
+    ids = _record_ids(df)
+    levels = df['stress_level'].tolist()
+    wss = df['wss'].tolist()
+    factors = _factor_blocks(df)
+    departments = (["Department: " + str(d) + "\n" for d in df['department']]
+                   if 'department' in df.columns else [''] * len(df))
+    predictions = (["Model Prediction: " + str(p) + "\n" for p in df['model_prediction']]
+                   if 'model_prediction' in df.columns else [''] * len(df))
+
+    fallback = templates[None]
+    texts = [
+        templates.get(level, fallback).format(
+            faculty_id=faculty_id, department=department, wss=score,
+            stress_level=level, model_prediction=prediction, factors=factor_text
+        )
+        for faculty_id, department, score, level, prediction, factor_text
+        in zip(ids, departments, wss, levels, predictions, factors)
+    ]
+    return ids, texts
+
+
+def _safe_filename(faculty_id):
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', faculty_id) or 'unknown'
+
+
+def report_filenames(ids):
+    """
+    Return one distinct report file name per record ID.
+
+    IDs that repeat, or that differ only in characters replaced for the
+    file system (e.g. 'F/1' and 'F_1') or in case, get their row position
+    appended, so no report overwrites another.
+    """
+    names = []
+    used = set()
+    for position, faculty_id in enumerate(ids):
+        stem = f"report_{_safe_filename(faculty_id)}"
+        name = f"{stem}.txt"
+        suffix = 0
+        while name.lower() in used:
+            suffix += 1
+            name = f"{stem}-{position}.txt" if suffix == 1 else f"{stem}-{position}-{suffix}.txt"
+        used.add(name.lower())
+        names.append(name)
+    return names
+
+
+def _write_files(output_dir, filenames, texts):
+    written = 0
+    for filename, text in zip(filenames, texts):
+        # Each report is rendered in full first, so one write per file
+        with open(os.path.join(output_dir, filename), 'w', encoding='utf-8') as f:
+            written += f.write(text)
+    return written
+
+
+def _render_slice(df, output_dir, filenames, templates):
+    _, texts = render_reports(df, templates)
+    if output_dir is None:
+        return ''.join(texts), 0
+    return None, _write_files(output_dir, filenames, texts)
+
+
+def write_reports(df, output_dir=DEFAULT_REPORTS_DIR, combined_file=None, workers=8,
+                  low_max=LOW_MAX, medium_max=MEDIUM_MAX):
+    """
+    Render and write reports for a whole batch.
+
+    The batch is split into one slice per worker; each worker renders its
+    slice and writes it with buffered file handles.
+
+    Args:
+        df: Batch scoring results (see render_reports).
+        output_dir: Directory for one report file per faculty member
+            (names from report_filenames()).
+        combined_file: If given, all reports are written to this single
+            file (in df order) instead of one file each.
+        workers: Number of writer threads.
+        low_max, medium_max: WSS cut-offs the records were scored with
+            (pass the predictor's), stated in each report's reasoning.
+
+    Returns:
+        Dict with 'reports', 'bytes', 'seconds', 'reports_per_second' and
+        'output' (the directory or combined file).
+    """
+    start = time.perf_counter()
+    target = combined_file or output_dir
+    directory = os.path.dirname(combined_file) if combined_file else output_dir
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    templates = TEMPLATES if (low_max, medium_max) == (LOW_MAX, MEDIUM_MAX) \
+        else compile_templates(low_max, medium_max)
+
+    # File names are made distinct over the whole batch, before slicing
+    filenames = None if combined_file else report_filenames(_record_ids(df))
+    bounds = np.linspace(0, len(df), max(1, min(workers, len(df))) + 1).astype(int)
+    slices = [(df.iloc[lo:hi], filenames[lo:hi] if filenames else None)
+              for lo, hi in zip(bounds[:-1], bounds[1:])]
+    with ThreadPoolExecutor(max_workers=len(slices)) as pool:
+        parts = list(pool.map(
+            lambda part: _render_slice(part[0], None if combined_file else output_dir, part[1],
+                                       templates),
+            slices
+        ))
+
+    if combined_file:
+        with open(combined_file, 'w', encoding='utf-8', buffering=WRITE_BUFFER_BYTES) as f:
+            written = sum(f.write(text) for text, _ in parts)
+    else:
+        written = sum(count for _, count in parts)
+
+    seconds = time.perf_counter() - start
+    return {
+        'reports': len(df),
+        'bytes': written,
+        'seconds': seconds,
+        'reports_per_second': len(df) / seconds if seconds > 0 else float('inf'),
+        'output': target,
+    }
@@ -0,0 +1,181 @@
+"""
+Columnar output for batch scoring results.
+Writes results as a Parquet (or Arrow IPC) dataset with narrow integer
+types, a dictionary-encoded stress level and optional zstd compression,
+partitioned by run date and/or input source, so each run adds files
+instead of overwriting the previous one and readers can scan only the
+columns and partitions they need.
+
+Requires the optional pyarrow package (pip install pyarrow).
+"""
+
+import os
+import re
+import sys
+import uuid
+from pathlib import Path
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ml_component.wss import STRESS_LEVELS
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+
+
+DEFAULT_RESULTS_DIR = 'integration/results'
+FORMATS = ['parquet', 'arrow']
+PARTITION_COLUMNS = ['run_date', 'source']
+
+# Result columns that hold a stress level
+LEVEL_COLUMNS = ['stress_level', 'model_prediction']
+
+# Fixed types of the known result columns, so every run writes the same
+# schema whatever its size (other integer columns are stored as int64)
+COLUMN_TYPES = {
+    'index': 'int32',
+    'source_row': 'int32',
+    'wss': 'int8',
+    'fingerprint': 'int64',
+}
+
+
+def pyarrow_available():
+    """Return True if columnar output can be written."""
+    return pa is not None
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Columnar results output requires pyarrow: pip install pyarrow")
+
+
+def narrow_results(df):
+    """
+    Return a copy of df with the known integer columns in their fixed
+    narrow types (COLUMN_TYPES) and stress level columns as categoricals
+    (dictionary-encoded on write).
+    """
+    out = df.copy()
+    for col in out.columns:
+        if col in LEVEL_COLUMNS:
+            out[col] = pd.Categorical(out[col], categories=STRESS_LEVELS)
+        elif col in COLUMN_TYPES:
+            out[col] = out[col].astype(COLUMN_TYPES[col])
+        elif pd.api.types.is_integer_dtype(out[col]):
+            out[col] = out[col].astype('int64')
+    return out
+
+
+def results_schema(df):
+    """
+    Explicit Arrow schema for a narrowed results frame: the COLUMN_TYPES
+    integers, stress levels as dictionary<int8, string> and strings as
+    string, so files from different runs can be read as one dataset.
+    """
+    _require_pyarrow()
+    inferred = pa.Schema.from_pandas(df, preserve_index=False)
+    fields = []
+    for field in inferred:
+        if field.name in LEVEL_COLUMNS:
+            field = field.with_type(pa.dictionary(pa.int8(), pa.string()))
+        elif field.name in COLUMN_TYPES:
+            field = field.with_type(pa.from_numpy_dtype(COLUMN_TYPES[field.name]))
+        elif pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            field = field.with_type(pa.string())
+        fields.append(field)
+    return pa.schema(fields)
+
+
+def _partition_value(value):
+    """Make a value safe to use as a directory name."""
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', str(value)) or 'unknown'
+
+
+def write_results(df, output_dir=DEFAULT_RESULTS_DIR, run_date=None, source=None,
+                  partition_by=('run_date',), file_format='parquet', compression='zstd'):
+    """
+    Write batch results as a partitioned columnar dataset.
+
+    Args:
+        df: Batch results (e.g. index, wss, stress_level).
+        output_dir: Root directory of the dataset.
+        run_date: Date of the run (default: today, UTC); stored as 'run_date'.
+        source: Input the results came from (e.g. 'dataset.xlsx'); stored
+            as 'source'.
+        partition_by: Any of 'run_date' and 'source'; each becomes a
+            directory level (run_date=2024-05-01/source=.../part-....parquet).
+        file_format: 'parquet' or 'arrow' (Arrow IPC).
+        compression: 'zstd', another codec supported by the format, or None.
+
+    Returns:
+        List of the files written.
+    """
+    _require_pyarrow()
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown results format: {file_format}. Choose from {FORMATS}")
+    unknown = [col for col in partition_by if col not in PARTITION_COLUMNS]
+    if unknown:
+        raise ValueError(f"Cannot partition by {unknown}. Choose from {PARTITION_COLUMNS}")
+
+    out = narrow_results(df)
+    run_date = run_date or datetime.now(timezone.utc).date()
+    out['run_date'] = _partition_value(pd.Timestamp(run_date).date().isoformat())
+    out['source'] = _partition_value(source if source is not None else 'unknown')
+    table = pa.Table.from_pandas(out, schema=results_schema(out), preserve_index=False)
+
+    if file_format == 'parquet':
+        fmt = ds.ParquetFileFormat()
+        options = fmt.make_write_options(compression=compression or 'none', use_dictionary=True)
+    else:
+        fmt = ds.IpcFileFormat()
+        options = fmt.make_write_options(compression=compression)
+
+    # A unique file name per run, so runs sharing a partition add files
+    # instead of replacing each other
+    written = []
+    ds.write_dataset(
+        table, output_dir, format=fmt, file_options=options,
+        partitioning=list(partition_by) or None, partitioning_flavor='hive',
+        basename_template=f"part-{uuid.uuid4().hex[:12]}-{{i}}.{file_format}",
+        existing_data_behavior='overwrite_or_ignore',
+        file_visitor=lambda f: written.append(f.path),
+    )
+    return written
+
+
+def read_results(output_dir=DEFAULT_RESULTS_DIR, columns=None, file_format='parquet', **filters):
+    """
+    Read a results dataset, loading only the requested columns and the
+    partitions matching the filters.
+
+    Example:
+        read_results(columns=['stress_level'], run_date='2024-05-01')
+
+    Returns:
+        DataFrame of the matching rows.
+    """
+    _require_pyarrow()
+    dataset = ds.dataset(output_dir, format='ipc' if file_format == 'arrow' else file_format,
+                         partitioning='hive')
+    expression = None
+    for col, value in filters.items():
+        condition = pc.field(col) == _partition_value(value)
+        expression = condition if expression is None else expression & condition
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+
+def dataset_size(output_dir=DEFAULT_RESULTS_DIR):
+    """Total size in bytes of the files under a results dataset."""
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(output_dir) for name in files
+    )
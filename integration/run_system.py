@@ -13,6 +13,12 @@ import pandas as pd
 sys.path.append(str(Path(__file__).parent.parent))
 
 from ml_component.stress_predictor import FacultyStressPredictor, write_stress_output
+from ml_component.history_store import FacultyHistoryStore
+from ml_component.incremental import incremental_score
+from ml_component.model_registry import ModelRegistry
+from ml_component.aggregate_cube import AggregateCube
+from report_renderer import write_reports, DEFAULT_REPORTS_DIR
+from results_writer import pyarrow_available, write_results, DEFAULT_RESULTS_DIR
 
 
 def display_menu():
@@ -26,7 +32,8 @@ def display_menu():
     print("2. Select faculty from dataset")
     print("3. Batch analyze entire dataset")
     print("4. View model performance")
-    print("5. Exit")
+    print("5. Batch analyze and write personalized reports")
+    print("6. Exit")
     print("=" * 60)
 
 
@@ -116,6 +123,8 @@ def select_faculty_from_dataset(predictor):
     if df is None:
         print("Error: Could not load dataset.")
         return None
+    # Number the rows left after quarantine 0..n-1, as they are selected
+    df = df.reset_index(drop=True)
     
     print(f"\nDataset contains {len(df)} faculty records.")
     print("\nFirst 10 records:")
@@ -139,33 +148,62 @@ def select_faculty_from_dataset(predictor):
         return None
 
 
-def batch_analyze_dataset(predictor):
-    """Batch analyze the entire dataset."""
+def batch_analyze_dataset(predictor, write_report_files=False):
+    """Batch analyze the entire dataset.
+    
+    Args:
+        predictor: FacultyStressPredictor used for scoring.
+        write_report_files: If True, also write a personalized report per
+            faculty member to DEFAULT_REPORTS_DIR.
+    """
     print("\n" + "=" * 60)
     print("Batch Analyze Entire Dataset")
     print("=" * 60)
     
     # Load dataset
-    df = predictor.load_and_preprocess_data('dataset.xlsx')
+    df = predictor.load_and_preprocess_data('dataset.xlsx', keep_faculty_id=True)
     if df is None:
         print("Error: Could not load dataset.")
         return
     
     print(f"\nAnalyzing {len(df)} faculty records...")
     
-    # Analyze each record
-    results = []
-    for idx, row in df.iterrows():
-        faculty_data = row[predictor.feature_names].to_dict()
-        result = predictor.predict_stress(faculty_data)
-        results.append({
-            'index': idx,
-            'wss': result['wss'],
-            'stress_level': result['stress_level']
-        })
-    
-    # Create results DataFrame
-    results_df = pd.DataFrame(results)
+    output_file = 'integration/batch_analysis_results.csv'
+    if 'faculty_id' not in df.columns:
+        df['faculty_id'] = df.index.astype(str)
+    
+    # Only re-score records that changed since the previous run
+    previous_results = None
+    if os.path.exists(output_file):
+        previous_results = pd.read_csv(output_file, dtype={'faculty_id': str})
+    scores, stats = incremental_score(predictor, df, previous_results)
+    print(f"Re-scored {stats['rescored']} records "
+          f"({stats['new']} new), carried forward {stats['carried_forward']}, "
+          f"{stats['removed']} no longer present.")
+    
+    df['wss'] = scores['wss']
+    df['stress_level'] = scores['stress_level']
+    
+    # Exact counts by factor bucket and level for drill-down queries
+    cube = AggregateCube.from_records(df, df['stress_level'])
+    results_df = scores
+    results_df.insert(0, 'index', df.index)
+    
+    # Append this snapshot to the longitudinal history
+    with FacultyHistoryStore() as history:
+        history.append_snapshot(df)
+        print(f"Snapshot appended to history: {history.db_path}")
+    
+    # Compare the scored records with the training distribution
+    if predictor.drift_monitor is not None:
+        drifted = predictor.drift_monitor.alerts()
+        if drifted:
+            print("\nWarning: input drift detected (PSI above "
+                  f"{predictor.drift_monitor.threshold}):")
+            for feature, psi in drifted.items():
+                print(f"  {feature}: PSI={psi:.3f}")
+        else:
+            print("\n+ No feature drift against the training data.")
     
     # Summary statistics
     print("\n" + "=" * 60)
@@ -176,11 +214,29 @@ def batch_analyze_dataset(predictor):
     print(results_df['stress_level'].value_counts())
     print(f"\nWSS Score Statistics:")
     print(results_df['wss'].describe())
+    print(f"\nHigh share with 5+ subjects and under 6h sleep: "
+          f"{cube.share('High', subjects_handled=3, sleep_hours=3):.1%} "
+          f"of {cube.count(subjects_handled=3, sleep_hours=3)}")
     
     # Save results
-    output_file = 'integration/batch_analysis_results.csv'
     results_df.to_csv(output_file, index=False)
     print(f"\nResults saved to: {output_file}")
+    cube_file = cube.save()
+    print(f"Aggregate cube saved to: {cube_file}")
+    
+    # Columnar copy partitioned by run date, kept across runs for dashboards
+    if pyarrow_available():
+        write_results(results_df, DEFAULT_RESULTS_DIR, source='dataset.xlsx')
+        print(f"Columnar results added to: {DEFAULT_RESULTS_DIR}")
+    else:
+        print("Note: install pyarrow to also write columnar (Parquet) results")
+    
+    # Personalized recommendation reports for every faculty member
+    if write_report_files:
+        report_stats = write_reports(df, DEFAULT_REPORTS_DIR, low_max=predictor.low_max,
+                                     medium_max=predictor.medium_max)
+        print(f"{report_stats['reports']} reports written to {report_stats['output']} "
+              f"in {report_stats['seconds']:.2f}s")
     
     print("\n" + "=" * 60)
 
@@ -326,10 +382,14 @@ def run_prolog_component(stress_level):
 def initialize_predictor():
     """Initialize and load/train the predictor model."""
     predictor = FacultyStressPredictor()
+    registry = ModelRegistry()
     
-    # Try to load existing model
+    # Prefer the promoted registry version, then the legacy model file
     model_path = 'ml_component/stress_model.pkl'
-    if os.path.exists(model_path):
+    if registry.current_version():
+        info = registry.hot_swap(predictor)
+        print(f"+ Loaded model {info['version']} from registry.")
+    elif os.path.exists(model_path):
         predictor.load_model()
         print("+ Loaded pre-trained model.")
     else:
@@ -339,6 +399,15 @@ def initialize_predictor():
         if df is not None:
             predictor.train_model(df)
             predictor.save_model()
+            
+            # Keep a versioned copy with its metrics and promote it
+            version = registry.register(
+                predictor,
+                metrics=predictor.evaluate_model_performance(),
+                metadata={'dataset': 'dataset.xlsx', 'records': len(df)}
+            )
+            registry.promote(version)
+            print(f"+ Registered model {version}.")
         else:
             print("Error: Could not load dataset for training.")
             return None
@@ -363,7 +432,7 @@ def main():
         display_menu()
         
         try:
-            choice = input("\nSelect option (1-5): ").strip()
+            choice = input("\nSelect option (1-6): ").strip()
             
             if choice == '1':
                 # Enter new faculty data for prediction
@@ -394,13 +463,17 @@ def main():
                 view_model_performance(predictor)
             
             elif choice == '5':
+                # Batch analyze and write a report per faculty member
+                batch_analyze_dataset(predictor, write_report_files=True)
+            
+            elif choice == '6':
                 # Exit
                 print("\nThank you for using the AI-Powered Faculty Stress Detector!")
                 print("Exiting...")
                 break
             
             else:
-                print("\nInvalid option. Please select 1-5.")
+                print("\nInvalid option. Please select 1-6.")
         
         except KeyboardInterrupt:
             print("\n\nExiting...")
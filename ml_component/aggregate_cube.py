@@ -0,0 +1,197 @@
+"""
+Aggregate count cube for cohort drill-down queries.
+Every factor contributes 1-3 WSS points, so a scored population can be
+summarized exactly as counts over (9 factor buckets x stress level):
+3^9 * 3 = 59,049 cells, about 460 KB. Any slice such as "High share among
+faculty with 5+ subjects and under 6h sleep" (subjects_handled=3,
+sleep_hours=3) is then answered from the cube without re-scanning records.
+"""
+
+import os
+import glob
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .wss import FEATURE_NAMES, LOW_MAX, MEDIUM_MAX, STRESS_LEVELS, WSS_SPEC_VERSION, factor_points, stress_level_codes
+except ImportError:
+    from wss import FEATURE_NAMES, LOW_MAX, MEDIUM_MAX, STRESS_LEVELS, WSS_SPEC_VERSION, factor_points, stress_level_codes
+
+
+DEFAULT_CUBE_DIR = 'integration/cubes'
+
+POINTS = [1, 2, 3]
+CUBE_SHAPE = (len(POINTS),) * len(FEATURE_NAMES) + (len(STRESS_LEVELS),)
+
+
+def _level_codes(levels):
+    """Convert stress level labels (or 0/1/2 codes) to codes."""
+    levels = np.asarray(levels)
+    if np.issubdtype(levels.dtype, np.integer):
+        return levels.astype(np.intp)
+    codes = pd.Categorical(levels, categories=STRESS_LEVELS).codes
+    if (codes < 0).any():
+        raise ValueError(f"Unknown stress level(s): {sorted(set(levels[codes < 0]))}")
+    return codes.astype(np.intp)
+
+
+def run_cube_file(directory=DEFAULT_CUBE_DIR, run_time=None):
+    """Cube file for one run: <directory>/cube-<UTC run time>.npz."""
+    run_time = run_time or datetime.now(timezone.utc)
+    return os.path.join(directory, f"cube-{run_time:%Y%m%dT%H%M%S%fZ}.npz")
+
+
+def latest_cube_file(directory=DEFAULT_CUBE_DIR):
+    """Return the most recent run's cube file, or None if there is none."""
+    files = sorted(glob.glob(os.path.join(directory, 'cube-*.npz')))
+    return files[-1] if files else None
+
+
+class AggregateCube:
+    """Exact record counts by factor bucket points and stress level."""
+
+    def __init__(self, counts=None):
+        self.counts = np.zeros(CUBE_SHAPE, dtype=np.int64) if counts is None \
+            else np.asarray(counts, dtype=np.int64).reshape(CUBE_SHAPE)
+
+    @classmethod
+    def from_records(cls, df, levels=None, low_max=LOW_MAX, medium_max=MEDIUM_MAX):
+        """Build a cube from records (see add())."""
+        cube = cls()
+        cube.add(df, levels, low_max, medium_max)
+        return cube
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def add(self, X, levels=None, low_max=LOW_MAX, medium_max=MEDIUM_MAX):
+        """
+        Add records to the cube.
+
+        Args:
+            X: DataFrame with the nine features (or an (n, 9) array).
+            levels: Stress level labels or codes per record; defaults to the
+                WSS stress level under low_max/medium_max.
+            low_max, medium_max: WSS cut-offs used when levels is None
+                (pass the scoring predictor's).
+        """
+        points = factor_points(X).astype(np.intp) - 1
+        if levels is None:
+            codes = stress_level_codes(points.sum(axis=1) + len(FEATURE_NAMES), low_max, medium_max)
+        else:
+            codes = _level_codes(levels)
+        flat = np.ravel_multi_index(tuple(points.T) + (codes,), CUBE_SHAPE)
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(CUBE_SHAPE)
+
+    def merge(self, other):
+        """Add another cube's counts (e.g. from another batch) to this one."""
+        self.counts += other.counts
+
+    def _slice(self, conditions):
+        """
+        Reduce the cube to the cells matching conditions, keeping all axes.
+        conditions map a feature to the bucket points (1-3, or a list).
+        """
+        index = [slice(None)] * self.counts.ndim
+        selections = []
+        for feature, points in conditions.items():
+            if feature not in FEATURE_NAMES:
+                raise ValueError(f"Unknown feature: {feature}")
+            axis = FEATURE_NAMES.index(feature)
+            if isinstance(points, (int, np.integer)) and points in POINTS:
+                # Single bucket: a length-1 slice is a view, no copy
+                index[axis] = slice(points - 1, points)
+                continue
+            points = np.atleast_1d(points)
+            if not np.isin(points, POINTS).all():
+                raise ValueError(f"Bucket points for {feature} must be 1, 2 or 3, got {points.tolist()}")
+            selections.append((axis, points - 1))
+        cells = self.counts[tuple(index)]
+        for axis, positions in selections:
+            cells = np.take(cells, positions, axis=axis)
+        return cells
+
+    def level_counts(self, **conditions):
+        """
+        Count records per stress level among those matching the conditions.
+
+        Example:
+            cube.level_counts(subjects_handled=3, sleep_hours=3)
+        """
+        cells = self._slice(conditions)
+        totals = cells.reshape(-1, len(STRESS_LEVELS)).sum(axis=0)
+        return dict(zip(STRESS_LEVELS, totals.tolist()))
+
+    def count(self, level=None, **conditions):
+        """Number of matching records (at the given stress level, if any)."""
+        counts = self.level_counts(**conditions)
+        return counts[level] if level is not None else sum(counts.values())
+
+    def share(self, level, **conditions):
+        """Share of matching records at a stress level (0.0 if none match)."""
+        counts = self.level_counts(**conditions)
+        total = sum(counts.values())
+        return counts[level] / total if total else 0.0
+
+    def drill_down(self, feature, **conditions):
+        """
+        Break the matching records down by one feature's bucket points.
+
+        Returns:
+            DataFrame indexed by points (1-3) with a count per stress level,
+            'total' and 'high_share'.
+        """
+        if feature not in FEATURE_NAMES:
+            raise ValueError(f"Unknown feature: {feature}")
+        cells = self._slice(conditions)
+        axis = FEATURE_NAMES.index(feature)
+        other_axes = tuple(i for i in range(len(FEATURE_NAMES)) if i != axis)
+        table = pd.DataFrame(cells.sum(axis=other_axes), columns=STRESS_LEVELS,
+                             index=pd.Index(POINTS, name=f"{feature}_points"))
+        table['total'] = table[STRESS_LEVELS].sum(axis=1)
+        table['high_share'] = (table['High'] / table['total'].where(table['total'] > 0)).fillna(0.0)
+        return table
+
+    def save(self, filepath=None):
+        """
+        Save the cube (compressed npz) with its layout and WSS spec version.
+
+        Args:
+            filepath: Target file; defaults to a new per-run file in
+                DEFAULT_CUBE_DIR (see run_cube_file()), so earlier runs'
+                cubes are kept.
+
+        Returns:
+            The path written.
+        """
+        filepath = filepath or run_cube_file()
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+        np.savez_compressed(
+            filepath,
+            counts=self.counts,
+            feature_names=np.array(FEATURE_NAMES),
+            stress_levels=np.array(STRESS_LEVELS),
+            wss_spec_version=np.array(WSS_SPEC_VERSION),
+        )
+        return filepath
+
+    @classmethod
+    def load(cls, filepath=None):
+        """
+        Load a saved cube (default: the latest run's); its layout must match
+        the current features.
+        """
+        filepath = filepath or latest_cube_file()
+        if filepath is None:
+            raise ValueError(f"No saved cubes in {DEFAULT_CUBE_DIR}")
+        with np.load(filepath) as data:
+            if list(data['feature_names']) != FEATURE_NAMES \
+                    or list(data['stress_levels']) != STRESS_LEVELS:
+                raise ValueError(f"Cube layout in {filepath} does not match the current features")
+            if str(data['wss_spec_version']) != WSS_SPEC_VERSION:
+                raise ValueError(f"Cube in {filepath} was built with WSS spec "
+                                 f"{data['wss_spec_version']}, current is {WSS_SPEC_VERSION}")
+            return cls(data['counts'])
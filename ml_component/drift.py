@@ -0,0 +1,129 @@
+"""
+Feature drift monitoring.
+Keeps exact per-value counts of every (small integer) feature for the
+training data and for the records scored since the monitor was created,
+and compares the two with PSI and KL divergence per feature.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .wss import FEATURE_NAMES, FEATURE_RANGES
+except ImportError:
+    from wss import FEATURE_NAMES, FEATURE_RANGES
+
+
+# PSI above 0.2 is the usual "significant shift" rule of thumb
+DEFAULT_PSI_THRESHOLD = 0.2
+
+# Exact counts are merged into about this many reference-quantile bins before
+# comparing, so wide features (e.g. students_total) are not dominated by noise
+COMPARISON_BINS = 10
+
+_EPSILON = 1e-4
+
+
+def feature_histograms(df, ranges=FEATURE_RANGES, weights=None):
+    """
+    Return exact value counts of every feature as int64 arrays.
+    Bin 0 counts values below the feature range, the last bin values above
+    it, and the bins in between one value each. Optional per-row weights
+    (e.g. counts of deduplicated rows) are summed instead of counting rows.
+    """
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64)
+    histograms = {}
+    for name in FEATURE_NAMES:
+        low, high = ranges[name]
+        n_bins = high - low + 3
+        values = df[name].to_numpy()
+        row_weights = weights
+        if not np.issubdtype(values.dtype, np.integer):
+            values = np.asarray(values, dtype=np.float64)
+            present = ~np.isnan(values)
+            values = np.floor(values[present])
+            row_weights = weights[present] if weights is not None else None
+        bins = np.clip(values - (low - 1), 0, n_bins - 1).astype(np.intp)
+        counts = np.bincount(bins, weights=row_weights, minlength=n_bins)
+        histograms[name] = np.rint(counts).astype(np.int64)
+    return histograms
+
+
+def _comparison_groups(reference, n_groups=COMPARISON_BINS):
+    """Assign each exact bin to one of ~n_groups reference-quantile groups."""
+    total = reference.sum()
+    if total == 0:
+        return np.zeros(len(reference), dtype=np.intp)
+    start = (np.cumsum(reference) - reference) / total
+    return np.minimum((start * n_groups).astype(np.intp), n_groups - 1)
+
+
+def psi_and_kl(reference, current, n_groups=COMPARISON_BINS):
+    """Return (PSI, KL(current || reference)) of two count arrays."""
+    groups = _comparison_groups(reference, n_groups)
+    ref = np.bincount(groups, weights=reference).astype(np.float64)
+    cur = np.bincount(groups, weights=current, minlength=len(ref)).astype(np.float64)
+    if ref.sum() == 0 or cur.sum() == 0:
+        return 0.0, 0.0
+    p = np.maximum(cur / cur.sum(), _EPSILON)
+    q = np.maximum(ref / ref.sum(), _EPSILON)
+    return float(np.sum((p - q) * np.log(p / q))), float(np.sum(p * np.log(p / q)))
+
+
+class DriftMonitor:
+    """Compares scored records against the training distribution."""
+
+    def __init__(self, reference, threshold=DEFAULT_PSI_THRESHOLD):
+        """
+        Args:
+            reference: Dict feature -> training count array, as returned by
+                feature_histograms() (this is what is stored with the model).
+            threshold: PSI above which a feature is reported as drifted.
+        """
+        self.reference = {name: np.asarray(counts, dtype=np.int64)
+                          for name, counts in reference.items()}
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def from_frame(cls, df, threshold=DEFAULT_PSI_THRESHOLD, weights=None):
+        """Build a monitor whose reference is the given (training) data."""
+        return cls(feature_histograms(df, weights=weights), threshold)
+
+    def reset(self):
+        """Forget everything observed so far."""
+        with self._lock:
+            self.current = {name: np.zeros_like(counts) for name, counts in self.reference.items()}
+            self.observed = 0
+
+    def update(self, df):
+        """Add a batch of scored records to the current histograms."""
+        if len(df) == 0:
+            return
+        batch = feature_histograms(df)
+        with self._lock:
+            for name, counts in batch.items():
+                self.current[name] += counts
+            self.observed += len(df)
+
+    def report(self):
+        """
+        Return a DataFrame indexed by feature with psi, kl and alert columns
+        for everything observed since the last reset.
+        """
+        with self._lock:
+            current = {name: counts.copy() for name, counts in self.current.items()}
+        rows = []
+        for name in FEATURE_NAMES:
+            psi, kl = psi_and_kl(self.reference[name], current[name])
+            rows.append({'feature': name, 'psi': psi, 'kl': kl, 'alert': psi > self.threshold})
+        return pd.DataFrame(rows).set_index('feature')
+
+    def alerts(self):
+        """Return the drifted features as {feature: psi}."""
+        report = self.report()
+        return report.loc[report['alert'], 'psi'].to_dict()
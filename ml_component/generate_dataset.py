@@ -58,6 +58,32 @@ def generate_dataset(num_records=250, output_file='dataset.xlsx'):
     return df
 
 
+def generate_records(num_records, seed=42, with_ids=True):
+    """
+    Generate synthetic faculty records in one vectorized draw.
+    Uses the same distributions as generate_dataset but returns a DataFrame
+    with the predictor's feature names, so millions of rows can be produced
+    quickly for benchmarks. Set with_ids=False to skip the faculty_id column.
+    """
+    rng = np.random.default_rng(seed)
+    n = num_records
+    
+    df = pd.DataFrame({
+        'subjects_handled': rng.choice([1, 2, 3, 4, 5, 6], n, p=[0.1, 0.15, 0.25, 0.25, 0.15, 0.1]),
+        'students_total': rng.integers(20, 200, n),
+        'prep_hours': rng.integers(3, 15, n),
+        'research_load_hours': rng.integers(0, 12, n),
+        'committee_duties': rng.choice([0, 1, 2, 3, 4], n, p=[0.2, 0.3, 0.3, 0.15, 0.05]),
+        'admin_tasks': rng.choice([0, 1, 2, 3, 4, 5], n, p=[0.15, 0.25, 0.25, 0.2, 0.1, 0.05]),
+        'meeting_hours': rng.integers(0, 10, n),
+        'sleep_hours': rng.choice([4, 5, 6, 7, 8, 9], n, p=[0.05, 0.1, 0.2, 0.3, 0.25, 0.1]),
+        'weekend_work': rng.choice([0, 1, 2, 3, 4, 5, 6], n, p=[0.2, 0.25, 0.2, 0.15, 0.1, 0.05, 0.05])
+    })
+    if with_ids:
+        df.insert(0, 'faculty_id', [f"F{i:07d}" for i in range(1, n + 1)])
+    return df
+
+
 if __name__ == "__main__":
     # Check if dataset exists
     if os.path.exists('dataset.xlsx'):
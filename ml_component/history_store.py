@@ -0,0 +1,227 @@
+"""
+Longitudinal faculty history store.
+Appends every scored snapshot to an embedded SQLite database keyed by
+faculty ID and timestamp, so stress trends can be followed across a semester.
+"""
+
+import os
+import sqlite3
+
+import pandas as pd
+
+try:
+    from .wss import FEATURE_NAMES
+except ImportError:
+    from wss import FEATURE_NAMES
+
+
+DEFAULT_HISTORY_DB = 'integration/faculty_history.db'
+
+_SNAPSHOT_COLUMNS = ['faculty_id', 'scored_at', 'department'] + FEATURE_NAMES + ['wss', 'stress_level']
+
+
+def _to_epoch(timestamp):
+    """Convert a datetime, string or pandas Timestamp to UTC epoch seconds."""
+    ts = pd.Timestamp(timestamp)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return int(ts.value // 10**9)
+
+
+class FacultyHistoryStore:
+    """Append-only store of scored faculty snapshots with indexed time queries."""
+
+    def __init__(self, db_path=DEFAULT_HISTORY_DB):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        feature_cols = ",\n".join(f"    {name} INTEGER" for name in FEATURE_NAMES)
+        with self.conn:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    faculty_id TEXT NOT NULL,
+                    scored_at INTEGER NOT NULL,
+                    department TEXT,
+                {feature_cols},
+                    wss INTEGER NOT NULL,
+                    stress_level TEXT NOT NULL
+                )
+            """)
+            # (faculty_id, scored_at) serves trajectories and keeps re-appends idempotent
+            self.conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_snapshots_faculty_time "
+                "ON snapshots (faculty_id, scored_at)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_snapshots_time ON snapshots (scored_at)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_snapshots_department_time "
+                "ON snapshots (department, scored_at)"
+            )
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append_snapshot(self, df, scored_at=None):
+        """
+        Append one scored snapshot.
+
+        Args:
+            df: DataFrame with 'faculty_id', 'wss', 'stress_level' and the nine
+                workload features. An optional 'department' column is stored too.
+            scored_at: Timestamp of the snapshot (defaults to now, UTC).
+
+        Returns:
+            Number of rows written. A faculty member scored twice at the same
+            timestamp keeps only the latest values.
+        """
+        if 'faculty_id' not in df.columns:
+            raise ValueError("Snapshot requires a 'faculty_id' column")
+
+        snapshot = pd.DataFrame({
+            'faculty_id': df['faculty_id'].astype(str),
+            'scored_at': _to_epoch(scored_at if scored_at is not None else pd.Timestamp.now(tz='UTC')),
+            'department': df['department'].astype(object) if 'department' in df.columns else None,
+        })
+        for col in FEATURE_NAMES + ['wss']:
+            snapshot[col] = df[col].astype('int64')
+        snapshot['stress_level'] = df['stress_level'].astype(str)
+
+        placeholders = ", ".join("?" for _ in _SNAPSHOT_COLUMNS)
+        rows = snapshot[_SNAPSHOT_COLUMNS].astype(object).where(snapshot.notna(), None)
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO snapshots ({', '.join(_SNAPSHOT_COLUMNS)}) "
+                f"VALUES ({placeholders})",
+                rows.itertuples(index=False, name=None)
+            )
+        return len(snapshot)
+
+    def _query(self, sql, params=()):
+        df = pd.read_sql_query(sql, self.conn, params=params)
+        if 'scored_at' in df.columns:
+            df['scored_at'] = pd.to_datetime(df['scored_at'], unit='s')
+        return df
+
+    def trajectory(self, faculty_id, start=None, end=None):
+        """Return every snapshot of one faculty member ordered by time."""
+        sql = "SELECT * FROM snapshots WHERE faculty_id = ?"
+        params = [str(faculty_id)]
+        if start is not None:
+            sql += " AND scored_at >= ?"
+            params.append(_to_epoch(start))
+        if end is not None:
+            sql += " AND scored_at < ?"
+            params.append(_to_epoch(end))
+        return self._query(sql + " ORDER BY scored_at", params)
+
+    def department_rolling_average(self, department=None, window_days=7, start=None, end=None):
+        """
+        Return the rolling mean WSS and High share per department.
+
+        Daily sums are aggregated in SQL; the rolling window is then applied to
+        those (small) daily totals, so the cost does not grow with the window.
+
+        Returns:
+            DataFrame with department, day, snapshots, mean_wss, high_share,
+            rolling_mean_wss and rolling_high_share.
+        """
+        sql = """
+            SELECT department,
+                   scored_at - scored_at % 86400 AS day,
+                   COUNT(*) AS snapshots,
+                   SUM(wss) AS wss_sum,
+                   SUM(stress_level = 'High') AS high_count
+            FROM snapshots WHERE 1 = 1
+        """
+        params = []
+        if department is not None:
+            sql += " AND department = ?"
+            params.append(department)
+        if start is not None:
+            sql += " AND scored_at >= ?"
+            params.append(_to_epoch(start))
+        if end is not None:
+            sql += " AND scored_at < ?"
+            params.append(_to_epoch(end))
+        sql += " GROUP BY department, day ORDER BY department, day"
+
+        daily = pd.read_sql_query(sql, self.conn, params=params)
+        daily['day'] = pd.to_datetime(daily['day'], unit='s')
+        daily['department'] = daily['department'].fillna('(none)')
+
+        window = f"{int(window_days)}D"
+        rolled = (
+            daily.set_index('day')
+            .groupby('department')[['snapshots', 'wss_sum', 'high_count']]
+            .rolling(window).sum()
+            .reset_index()
+            .rename(columns={'snapshots': 'rolling_snapshots',
+                             'wss_sum': 'rolling_wss_sum',
+                             'high_count': 'rolling_high_count'})
+        )
+        daily = daily.merge(rolled, on=['department', 'day'])
+        daily['mean_wss'] = daily['wss_sum'] / daily['snapshots']
+        daily['high_share'] = daily['high_count'] / daily['snapshots']
+        daily['rolling_mean_wss'] = daily['rolling_wss_sum'] / daily['rolling_snapshots']
+        daily['rolling_high_share'] = daily['rolling_high_count'] / daily['rolling_snapshots']
+        return daily.drop(columns=['wss_sum', 'high_count', 'rolling_wss_sum',
+                                   'rolling_high_count', 'rolling_snapshots'])
+
+    def newly_high(self, since, until=None, include_new_faculty=False):
+        """
+        Return faculty whose latest snapshot in [since, until) is High while
+        their latest snapshot before `since` was not High.
+
+        Args:
+            since: Start of the period (e.g. the start of this week).
+            until: End of the period (defaults to no upper bound).
+            include_new_faculty: Also report faculty with no snapshot before
+                `since` whose first snapshot is High.
+        """
+        since_epoch = _to_epoch(since)
+        until_epoch = _to_epoch(until) if until is not None else 2**62
+        # Correlated MAX() lookups are index seeks on (faculty_id, scored_at),
+        # so only the snapshots inside the period are scanned.
+        sql = f"""
+            WITH cur AS (
+                SELECT faculty_id, MAX(scored_at) AS t
+                FROM snapshots
+                WHERE scored_at >= ? AND scored_at < ?
+                GROUP BY faculty_id
+            ),
+            pairs AS (
+                SELECT faculty_id, t,
+                       (SELECT MAX(scored_at) FROM snapshots p
+                        WHERE p.faculty_id = cur.faculty_id AND p.scored_at < ?) AS prev_t
+                FROM cur
+            )
+            SELECT s.faculty_id, s.department, s.scored_at, s.wss, s.stress_level,
+                   p.wss AS previous_wss, p.stress_level AS previous_level
+            FROM pairs
+            JOIN snapshots s ON s.faculty_id = pairs.faculty_id AND s.scored_at = pairs.t
+            LEFT JOIN snapshots p ON p.faculty_id = pairs.faculty_id AND p.scored_at = pairs.prev_t
+            WHERE s.stress_level = 'High'
+              AND {"(p.stress_level IS NULL OR p.stress_level != 'High')" if include_new_faculty
+                   else "p.stress_level IS NOT NULL AND p.stress_level != 'High'"}
+            ORDER BY s.faculty_id
+        """
+        return self._query(sql, (since_epoch, until_epoch, since_epoch))
+
+    def count(self):
+        """Return the total number of stored snapshot rows."""
+        return self.conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
@@ -0,0 +1,103 @@
+"""
+Model backends for FacultyStressPredictor.
+Each backend is a factory returning an unfitted scikit-learn estimator that
+takes the nine workload features (DataFrame) and predicts the stress level.
+"""
+
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder
+from sklearn.tree import DecisionTreeClassifier
+
+try:
+    from .wss import FEATURE_NAMES, factor_points
+except ImportError:
+    from wss import FEATURE_NAMES, factor_points
+
+
+DEFAULT_BACKEND = 'random_forest'
+
+
+def bucket_features(X):
+    """Map raw feature values to their 1-3 WSS bucket points."""
+    return factor_points(X)
+
+
+def random_forest(class_weight='balanced'):
+    """The original 200-tree random forest."""
+    return RandomForestClassifier(
+        n_estimators=200,
+        random_state=42,
+        class_weight=class_weight,  # Handle class imbalance
+        max_depth=10,
+        min_samples_split=5,
+        min_samples_leaf=2
+    )
+
+
+def hist_gradient_boosting(class_weight='balanced'):
+    """Histogram-based gradient boosting."""
+    return HistGradientBoostingClassifier(
+        max_iter=200,
+        random_state=42,
+        class_weight=class_weight
+    )
+
+
+def logistic_onehot(class_weight='balanced'):
+    """Logistic regression on one-hot encoded WSS bucket points."""
+    return Pipeline([
+        ('buckets', FunctionTransformer(bucket_features)),
+        ('onehot', OneHotEncoder(categories=[[1, 2, 3]] * len(FEATURE_NAMES),
+                                 handle_unknown='ignore')),
+        ('classifier', LogisticRegression(max_iter=1000, class_weight=class_weight)),
+    ])
+
+
+def decision_tree(class_weight='balanced'):
+    """A single shallow decision tree."""
+    return DecisionTreeClassifier(
+        max_depth=8,
+        random_state=42,
+        class_weight=class_weight,
+        min_samples_leaf=2
+    )
+
+
+MODEL_BACKENDS = {
+    'random_forest': random_forest,
+    'hist_gradient_boosting': hist_gradient_boosting,
+    'logistic_onehot': logistic_onehot,
+    'decision_tree': decision_tree,
+}
+
+
+def model_backend(model):
+    """Return the name of the backend a fitted model was built with, or None."""
+    for name, factory in MODEL_BACKENDS.items():
+        template = factory()
+        if type(model) is not type(template):
+            continue
+        if not isinstance(model, Pipeline) or \
+                [type(step) for _, step in model.steps] == [type(step) for _, step in template.steps]:
+            return name
+    return None
+
+
+def fit_model(model, X, y, sample_weight=None):
+    """Fit a backend estimator, routing sample weights into pipelines."""
+    if sample_weight is None:
+        return model.fit(X, y)
+    if isinstance(model, Pipeline):
+        final_step = model.steps[-1][0]
+        return model.fit(X, y, **{f"{final_step}__sample_weight": sample_weight})
+    return model.fit(X, y, sample_weight=sample_weight)
+
+
+def make_model(backend=DEFAULT_BACKEND, class_weight='balanced'):
+    """Return an unfitted estimator for the named backend."""
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model backend: {backend}. "
+                         f"Choose from {list(MODEL_BACKENDS)}")
+    return MODEL_BACKENDS[backend](class_weight=class_weight)
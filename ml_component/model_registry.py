@@ -0,0 +1,244 @@
+"""
+Local model registry.
+Stores every trained model as an immutable, numbered version (v0001, v0002,
+...) with its training metadata and evaluation metrics, tracks which version
+is current, hot-swaps a running predictor to a new version and shadow-scores
+candidate versions against the active model before promotion.
+
+Layout:
+    <root>/v0001/model.pkl
+    <root>/v0001/metadata.json
+    <root>/CURRENT              (name of the promoted version)
+"""
+
+import os
+import json
+import time
+import pickle
+import tempfile
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sklearn.metrics import accuracy_score, f1_score
+
+try:
+    from .wss import WSS_SPEC_VERSION, stress_levels
+    from .stress_predictor import model_digest, unpack_artifact
+    from .model_backends import model_backend
+except ImportError:
+    from wss import WSS_SPEC_VERSION, stress_levels
+    from stress_predictor import model_digest, unpack_artifact
+    from model_backends import model_backend
+
+
+DEFAULT_REGISTRY_DIR = 'ml_component/registry'
+
+
+def _json_safe(value):
+    """Convert numpy values inside metrics/metadata to JSON types."""
+    if isinstance(value, dict):
+        return {str(k): _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_json_safe(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _atomic_write(path, text):
+    """Write a small file so readers see either the old or the new content."""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    with os.fdopen(fd, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ModelRegistry:
+    """Versioned store of trained stress models."""
+
+    def __init__(self, root=DEFAULT_REGISTRY_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _version_dir(self, version):
+        return os.path.join(self.root, version)
+
+    def versions(self):
+        """Return all registered version names in order."""
+        return sorted(
+            name for name in os.listdir(self.root)
+            if name.startswith('v') and name[1:].isdigit()
+        )
+
+    def register(self, predictor, metrics=None, metadata=None):
+        """
+        Store the predictor's current model as a new version.
+
+        Args:
+            predictor: FacultyStressPredictor with a trained model.
+            metrics: Metrics dict, e.g. from evaluate_model_performance().
+            metadata: Extra training metadata (dataset path, notes, ...).
+
+        Returns:
+            The new version name. The version directory is fully written
+            before it becomes visible, so readers never see a partial artifact.
+        """
+        model, _ = predictor.active_model()
+        if model is None:
+            raise ValueError("Predictor has no trained model to register")
+
+        data = predictor.artifact_bytes()
+        info = {
+            'model_version': model_digest(data),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'backend': model_backend(model),
+            'model_class': type(model).__name__,
+            'model_params': {k: repr(v) for k, v in model.get_params().items()}
+                            if hasattr(model, 'get_params') else {},
+            'feature_names': list(predictor.feature_names),
+            'wss_spec_version': WSS_SPEC_VERSION,
+            'artifact_bytes': len(data),
+            'metrics': _json_safe(metrics or {}),
+            'training': _json_safe(metadata or {}),
+        }
+
+        staging = tempfile.mkdtemp(dir=self.root, prefix='.staging-')
+        with open(os.path.join(staging, 'model.pkl'), 'wb') as f:
+            f.write(data)
+
+        # Claim the next free number; rename fails if another writer won it
+        while True:
+            existing = self.versions()
+            number = int(existing[-1][1:]) + 1 if existing else 1
+            version = f"v{number:04d}"
+            info['version'] = version
+            with open(os.path.join(staging, 'metadata.json'), 'w') as f:
+                json.dump(info, f, indent=2)
+            try:
+                os.rename(staging, self._version_dir(version))
+                return version
+            except OSError:
+                if not os.path.exists(self._version_dir(version)):
+                    raise
+
+    def metadata(self, version):
+        """Return the stored metadata of a version."""
+        with open(os.path.join(self._version_dir(version), 'metadata.json')) as f:
+            return json.load(f)
+
+    def current_version(self):
+        """Return the promoted version name, or None."""
+        pointer = os.path.join(self.root, 'CURRENT')
+        if not os.path.exists(pointer):
+            return None
+        with open(pointer) as f:
+            return f.read().strip() or None
+
+    def promote(self, version):
+        """Make a version current (atomic pointer update)."""
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version: {version}")
+        _atomic_write(os.path.join(self.root, 'CURRENT'), version + "\n")
+
+    def _load_artifact(self, version):
+        version = version or self.current_version()
+        if version is None:
+            raise ValueError("No model version has been promoted")
+        with open(os.path.join(self._version_dir(version), 'model.pkl'), 'rb') as f:
+            model, drift_reference = unpack_artifact(pickle.load(f))
+        return model, drift_reference, self.metadata(version)
+
+    def load(self, version=None):
+        """
+        Load a version's model (default: the current version).
+        Returns (model, metadata).
+        """
+        model, _, info = self._load_artifact(version)
+        return model, info
+
+    def hot_swap(self, predictor, version=None):
+        """
+        Switch a running predictor to a version (default: the current one).
+        The artifact is loaded before the swap, so scoring continues on the
+        old model until the new one is ready. Returns the metadata.
+        """
+        model, drift_reference, info = self._load_artifact(version)
+        predictor.swap_model(model, info['model_version'], drift_reference)
+        return info
+
+    def sync(self, predictor):
+        """
+        Hot-swap the predictor if the current version changed since it was
+        loaded. Returns the new metadata, or None if already up to date.
+        """
+        version = self.current_version()
+        if version is None:
+            return None
+        info = self.metadata(version)
+        if info['model_version'] == predictor.model_version:
+            return None
+        return self.hot_swap(predictor, version)
+
+    def shadow_score(self, predictor, df, version):
+        """
+        Shadow-score a batch with a candidate version alongside the
+        predictor's active model. See shadow_score().
+        """
+        candidate, _ = self.load(version)
+        return shadow_score(predictor, candidate, df)
+
+
+def _timed_predict(model, X):
+    start = time.perf_counter()
+    predictions = model.predict(X)
+    return predictions, time.perf_counter() - start
+
+
+def shadow_score(predictor, candidate_model, df):
+    """
+    Score a batch with the active model and a candidate model in parallel.
+
+    The active model's predictions are returned as the served result; the
+    candidate's are only compared. Both are measured against the WSS-based
+    stress level.
+
+    Returns:
+        Dict with 'predictions' (active model output), 'active' and
+        'candidate' ({'accuracy', 'macro_f1', 'seconds', 'ms_per_record'}),
+        'delta' (candidate minus active for each of those) and 'agreement'
+        (share of records where both models agree).
+    """
+    active_model, _ = predictor.active_model()
+    if active_model is None:
+        raise ValueError("Predictor has no active model to compare against")
+
+    X = df[predictor.feature_names]
+    truth = stress_levels(predictor.calculate_wss_batch(df), predictor.low_max, predictor.medium_max)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        active_future = pool.submit(_timed_predict, active_model, X)
+        candidate_future = pool.submit(_timed_predict, candidate_model, X)
+        active_pred, active_seconds = active_future.result()
+        candidate_pred, candidate_seconds = candidate_future.result()
+
+    def summarize(pred, seconds):
+        return {
+            'accuracy': accuracy_score(truth, pred),
+            'macro_f1': f1_score(truth, pred, average='macro', zero_division=0),
+            'seconds': seconds,
+            'ms_per_record': 1000 * seconds / max(len(X), 1),
+        }
+
+    active = summarize(active_pred, active_seconds)
+    candidate = summarize(candidate_pred, candidate_seconds)
+    return {
+        'predictions': active_pred,
+        'active': active,
+        'candidate': candidate,
+        'delta': {k: candidate[k] - active[k] for k in active},
+        'agreement': float(np.mean(active_pred == candidate_pred)) if len(X) else 1.0,
+    }
@@ -5,9 +5,12 @@ Usage: python predict.py
 
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Import through the package (as run_system does) so pickled models that
+# reference ml_component modules load the same way from either entry point
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from stress_predictor import FacultyStressPredictor, write_stress_output
+from ml_component.stress_predictor import FacultyStressPredictor, write_stress_output
+from ml_component.wss import FEATURE_RANGES
 
 
 def get_faculty_input():
@@ -27,19 +30,7 @@ def get_faculty_input():
         sleep = int(input("Sleep hours per night [default: 6]: ") or "6")
         weekend = int(input("Weekend work frequency (times per month) [default: 2]: ") or "2")
         
-        # Validate ranges
-        if not (1 <= subjects <= 10):
-            print("Warning: Subjects should be between 1-10")
-        if not (20 <= students <= 300):
-            print("Warning: Students should be between 20-300")
-        if not (1 <= prep_hours <= 20):
-            print("Warning: Prep hours should be between 1-20")
-        if not (0 <= research <= 15):
-            print("Warning: Research hours should be between 0-15")
-        if not (4 <= sleep <= 10):
-            print("Warning: Sleep hours should be between 4-10")
-        
-        return {
+        faculty_data = {
             'subjects_handled': subjects,
             'students_total': students,
             'prep_hours': prep_hours,
@@ -50,6 +41,14 @@ def get_faculty_input():
             'sleep_hours': sleep,
             'weekend_work': weekend
         }
+        
+        # Validate ranges (same limits the batch validation applies)
+        for name, value in faculty_data.items():
+            low, high = FEATURE_RANGES[name]
+            if not (low <= value <= high):
+                print(f"Warning: {name} should be between {low}-{high}")
+        
+        return faculty_data
     except (ValueError, EOFError) as e:
         print(f"Error: {e}")
         print("Using default values for testing...")
@@ -0,0 +1,143 @@
+"""
+Department-level workload rebalancing.
+Treats committee duties and administrative tasks as transferable units
+within a department (department totals are conserved) and greedily applies
+the single transfer that most reduces the number of High-stress faculty,
+then the total WSS, until no transfer improves either.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .wss import MEDIUM_MAX, feature_points
+except ImportError:
+    from wss import MEDIUM_MAX, feature_points
+
+
+TRANSFERABLE_FEATURES = ['committee_duties', 'admin_tasks']
+
+# Most units a single person may hold after rebalancing
+DEFAULT_MAX_UNITS = {'committee_duties': 5, 'admin_tasks': 5}
+
+# One fewer High-stress person outweighs any change in total WSS
+_HIGH_WEIGHT = 100
+# Scale that leaves room for the recipient tie-break below the objective
+_TIE_SCALE = 1000
+
+
+def _best_transfer(values, wss, feature, units, cap, medium_max=MEDIUM_MAX):
+    """
+    Find the best transfer of `units` of `feature` from one person to another.
+    Returns (objective_gain, composite_score, donor, recipient) or None.
+
+    The objective gain is _HIGH_WEIGHT * (High count reduction) + (total WSS
+    reduction). It splits into a donor term minus a recipient term, so the
+    best pair is the best donor with the cheapest recipient, found with two
+    vectorized argmax/argmin scans instead of trying every pair.
+    """
+    points = feature_points(feature, values).astype(np.int32)
+
+    donor_ok = values >= units
+    gain = points - feature_points(feature, np.maximum(values - units, 0))
+    leaves_high = (wss > medium_max) & (wss - gain <= medium_max)
+    donor_key = np.where(donor_ok, _HIGH_WEIGHT * leaves_high + gain, -np.inf)
+
+    recipient_ok = values + units <= cap
+    cost = feature_points(feature, values + units) - points
+    becomes_high = (wss <= medium_max) & (wss + cost > medium_max)
+    recipient_key = _HIGH_WEIGHT * becomes_high + cost
+    # Among equally cheap recipients prefer the least loaded one
+    recipient_rank = np.where(recipient_ok, recipient_key * _TIE_SCALE + wss + cost, np.inf)
+
+    # Top-2 of each side is enough to avoid pairing a person with themself
+    donors = np.argpartition(-donor_key, 1)[:2]
+    recipients = np.argpartition(recipient_rank, 1)[:2]
+    best = None
+    for d in donors:
+        for r in recipients:
+            if d == r or not np.isfinite(donor_key[d]) or not np.isfinite(recipient_rank[r]):
+                continue
+            objective = donor_key[d] - recipient_key[r]
+            composite = donor_key[d] * _TIE_SCALE - recipient_rank[r]
+            if best is None or composite > best[1]:
+                best = (objective, composite, int(d), int(r))
+    return best
+
+
+def rebalance_department(predictor, df, features=TRANSFERABLE_FEATURES,
+                         max_units=None, max_moves=10000):
+    """
+    Search for transfers of duties between faculty that minimise the number
+    of High-stress faculty and then the total WSS.
+
+    Args:
+        predictor: FacultyStressPredictor used to score before and after.
+        df: One department's records with the nine workload features.
+        features: Transferable features (conserved in total).
+        max_units: Dict feature -> most units one person may hold
+            (defaults to DEFAULT_MAX_UNITS, or the current maximum if higher).
+        max_moves: Upper bound on the number of transfers applied.
+
+    Returns:
+        Dict with 'moves' (DataFrame of from_index, to_index, feature, units),
+        'rebalanced' (copy of df with new values, wss and stress_level),
+        'before' and 'after' ({'high_count', 'total_wss'}), 'iterations'
+        and 'solve_seconds'.
+    """
+    start = time.perf_counter()
+    max_units = dict(DEFAULT_MAX_UNITS, **(max_units or {}))
+
+    values = {f: df[f].to_numpy(dtype=np.int64).copy() for f in features}
+    caps = {f: max(int(max_units.get(f, values[f].max(initial=0))), int(values[f].max(initial=0)))
+            for f in features}
+    medium_max = predictor.medium_max
+    wss = predictor.calculate_wss_batch(df).astype(np.int64)
+    before = {'high_count': int((wss > medium_max).sum()), 'total_wss': int(wss.sum())}
+
+    moves = []
+    while len(moves) < max_moves and len(df) > 1:
+        candidates = []
+        for f in features:
+            for units in range(1, caps[f] + 1):
+                best = _best_transfer(values[f], wss, f, units, caps[f], medium_max)
+                if best is not None and best[0] > 0:
+                    # Prefer the higher composite score, then fewer units moved
+                    candidates.append((best[1], -units, f, best[2], best[3]))
+        if not candidates:
+            break
+        _, neg_units, f, donor, recipient = max(candidates)
+        units = -neg_units
+
+        old = feature_points(f, values[f][[donor, recipient]]).astype(np.int64)
+        values[f][donor] -= units
+        values[f][recipient] += units
+        new = feature_points(f, values[f][[donor, recipient]]).astype(np.int64)
+        wss[[donor, recipient]] += new - old
+        moves.append((df.index[donor], df.index[recipient], f, units))
+
+    rebalanced = df.copy()
+    for f in features:
+        rebalanced[f] = values[f]
+    # Hypothetical records must not reach the production drift histograms
+    scores = predictor.score_batch(rebalanced, track_drift=False)
+    rebalanced['wss'] = scores['wss']
+    rebalanced['stress_level'] = scores['stress_level']
+
+    return {
+        'moves': pd.DataFrame(moves, columns=['from_index', 'to_index', 'feature', 'units']),
+        'rebalanced': rebalanced,
+        'before': before,
+        'after': {'high_count': int((rebalanced['wss'] > medium_max).sum()),
+                  'total_wss': int(rebalanced['wss'].sum())},
+        'iterations': len(moves),
+        'solve_seconds': time.perf_counter() - start,
+    }
+
+
+def rebalance_departments(predictor, df, by='department', **kwargs):
+    """Run rebalance_department separately for every department in df."""
+    return {dept: rebalance_department(predictor, group, **kwargs)
+            for dept, group in df.groupby(by, sort=True)}
@@ -0,0 +1,207 @@
+"""
+What-if scenario simulation.
+Applies sets of workload interventions (e.g. cap meeting hours, add an hour
+of sleep) to a whole population and re-scores every record under every
+scenario in one broadcasted pass through the WSS engine and the trained
+model, reporting how many faculty move between stress levels.
+
+A scenario maps feature names to operations, applied in this order:
+    'set': replace the value
+    'add': add to the value (negative to reduce)
+    'min': raise values below this floor
+    'max': cap values above this ceiling
+Example: {'meeting_hours': {'max': 10}, 'sleep_hours': {'add': 1}}
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .wss import FEATURE_NAMES, STRESS_LEVELS, factor_points, stress_level_codes
+except ImportError:
+    from wss import FEATURE_NAMES, STRESS_LEVELS, factor_points, stress_level_codes
+
+
+# Interventions recommended by generateRecommendations("High") in main.pro
+RECOMMENDATION_SCENARIOS = {
+    'reduce subjects to 3': {'subjects_handled': {'max': 3}},
+    'delegate one admin task': {'admin_tasks': {'add': -1, 'min': 0}},
+    'relief from committees': {'committee_duties': {'max': 1}},
+    'meetings max 2 hours/day': {'meeting_hours': {'max': 10}},
+    'sleep 7+ hours': {'sleep_hours': {'min': 7}},
+    'all recommendations': {
+        'subjects_handled': {'max': 3},
+        'admin_tasks': {'add': -1, 'min': 0},
+        'committee_duties': {'max': 1},
+        'meeting_hours': {'max': 10},
+        'sleep_hours': {'min': 7},
+    },
+}
+
+_OPERATIONS = ('set', 'add', 'min', 'max')
+
+
+def scenario_grid(options):
+    """
+    Build the cartesian product of per-feature intervention options.
+
+    Args:
+        options: Dict mapping a feature name to a list of operation dicts,
+            e.g. {'meeting_hours': [{}, {'max': 6}, {'max': 3}],
+                  'sleep_hours': [{}, {'add': 1}]}
+
+    Returns:
+        Dict of scenario name -> scenario, one entry per combination.
+    """
+    features = list(options)
+    scenarios = {}
+    for combo in itertools.product(*(options[f] for f in features)):
+        scenario = {f: ops for f, ops in zip(features, combo) if ops}
+        name = "|".join(
+            f"{f}:" + ",".join(f"{op}={v}" for op, v in ops.items())
+            for f, ops in scenario.items()
+        ) or 'baseline'
+        scenarios[name] = scenario
+    return scenarios
+
+
+def _scenario_arrays(scenarios):
+    """Turn scenario dicts into (S, 9) parameter arrays for broadcasting."""
+    n_scen, n_feat = len(scenarios), len(FEATURE_NAMES)
+    set_mask = np.zeros((n_scen, n_feat), dtype=bool)
+    set_val = np.zeros((n_scen, n_feat))
+    add = np.zeros((n_scen, n_feat))
+    lo = np.full((n_scen, n_feat), -np.inf)
+    hi = np.full((n_scen, n_feat), np.inf)
+
+    for s, scenario in enumerate(scenarios.values()):
+        for feature, ops in scenario.items():
+            if feature not in FEATURE_NAMES:
+                raise ValueError(f"Unknown feature in scenario: {feature}")
+            unknown = set(ops) - set(_OPERATIONS)
+            if unknown:
+                raise ValueError(f"Unknown scenario operation(s): {sorted(unknown)}")
+            f = FEATURE_NAMES.index(feature)
+            if 'set' in ops:
+                set_mask[s, f] = True
+                set_val[s, f] = ops['set']
+            add[s, f] = ops.get('add', 0)
+            lo[s, f] = ops.get('min', -np.inf)
+            hi[s, f] = ops.get('max', np.inf)
+    return set_mask, set_val, add, lo, hi
+
+
+def _row_keys(rows):
+    """
+    Encode integer feature rows as single int64 keys (mixed radix) so unique
+    rows can be found with a 1-D sort. Returns None if the ranges are too wide.
+    """
+    mins = rows.min(axis=0)
+    spans = rows.max(axis=0) - mins + 1
+    if np.prod(spans.astype(float)) >= 2**62:
+        return None
+    multipliers = np.cumprod(np.concatenate(([1], spans[:-1]))).astype(np.int64)
+    return (rows - mins).astype(np.int64) @ multipliers
+
+
+def _predict_codes(model, rows):
+    """Predict stress level codes for rows, scoring each unique row once."""
+    keys = _row_keys(rows) if np.issubdtype(rows.dtype, np.integer) else None
+    if keys is not None:
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        unique_rows = rows[first]
+    else:
+        unique_rows, inverse = np.unique(rows, axis=0, return_inverse=True)
+    labels = model.predict(pd.DataFrame(unique_rows, columns=FEATURE_NAMES))
+    codes = pd.Index(STRESS_LEVELS).get_indexer(labels).astype(np.int8)
+    return codes[inverse.ravel()]
+
+
+def _transition_counts(base_codes, new_codes):
+    """Return (S, 3, 3) counts of baseline level -> scenario level."""
+    n_scen = new_codes.shape[0]
+    flat = (np.arange(n_scen)[:, None] * 9 + base_codes[None, :] * 3 + new_codes).ravel()
+    return np.bincount(flat, minlength=n_scen * 9).reshape(n_scen, 3, 3)
+
+
+def _summarize(prefix, transitions):
+    """Per-scenario level counts and movement totals from transition counts."""
+    counts = transitions.sum(axis=1)
+    return {
+        f'{prefix}_low': counts[:, 0],
+        f'{prefix}_medium': counts[:, 1],
+        f'{prefix}_high': counts[:, 2],
+        f'{prefix}_improved': np.tril(transitions, k=-1).sum(axis=(1, 2)),
+        f'{prefix}_worsened': np.triu(transitions, k=1).sum(axis=(1, 2)),
+    }
+
+
+def simulate_scenarios(predictor, df, scenarios, chunk_rows=2_000_000):
+    """
+    Re-score a population under every scenario.
+
+    Args:
+        predictor: FacultyStressPredictor; its model (if loaded) is applied
+            as well as the WSS rules.
+        df: Population DataFrame with the nine workload features.
+        scenarios: Dict of scenario name -> scenario (see module docstring).
+        chunk_rows: Upper bound on scenario x record rows materialised at
+            once; scenarios are processed in blocks of this size.
+
+    Returns:
+        Dict with:
+            'summary': DataFrame indexed by scenario name with level counts,
+                improved/worsened counts and mean WSS (wss_*), plus the same
+                counts for the model (model_*) when a model is loaded.
+            'wss_transitions': (S, 3, 3) baseline -> scenario level counts
+                using STRESS_LEVELS order.
+            'model_transitions': the same for the model, or None.
+    """
+    X = df[FEATURE_NAMES].to_numpy()
+    if np.issubdtype(X.dtype, np.integer):
+        X = X.astype(np.int32)
+    else:
+        X = X.astype(np.float64)
+    n_rows = len(X)
+    names = list(scenarios)
+    set_mask, set_val, add, lo, hi = _scenario_arrays(scenarios)
+
+    policy = (predictor.low_max, predictor.medium_max)
+    base_wss_codes = stress_level_codes(factor_points(X).sum(axis=-1), *policy)
+    model = predictor.model
+    base_model_codes = _predict_codes(model, X) if model is not None and n_rows else None
+
+    wss_transitions = np.zeros((len(names), 3, 3), dtype=np.int64)
+    model_transitions = np.zeros((len(names), 3, 3), dtype=np.int64) if model is not None else None
+    mean_wss = np.zeros(len(names))
+
+    block = max(1, chunk_rows // max(n_rows, 1))
+    for start in range(0, len(names), block):
+        sl = slice(start, start + block)
+        # (S, N, 9) feature values under each scenario of this block
+        values = np.where(set_mask[sl, None, :], set_val[sl, None, :], X[None, :, :])
+        values = np.clip(values + add[sl, None, :], lo[sl, None, :], hi[sl, None, :])
+        values = values.astype(X.dtype)
+
+        wss = factor_points(values).sum(axis=-1, dtype=np.int16)
+        mean_wss[sl] = wss.mean(axis=1) if n_rows else np.nan
+        wss_transitions[sl] = _transition_counts(base_wss_codes, stress_level_codes(wss, *policy))
+
+        if model is not None and n_rows:
+            codes = _predict_codes(model, values.reshape(-1, len(FEATURE_NAMES)))
+            model_transitions[sl] = _transition_counts(
+                base_model_codes, codes.reshape(values.shape[0], n_rows)
+            )
+
+    summary = _summarize('wss', wss_transitions)
+    summary['mean_wss'] = mean_wss
+    if model_transitions is not None:
+        summary.update(_summarize('model', model_transitions))
+
+    return {
+        'summary': pd.DataFrame(summary, index=pd.Index(names, name='scenario')),
+        'wss_transitions': wss_transitions,
+        'model_transitions': model_transitions,
+    }
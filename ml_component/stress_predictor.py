@@ -6,22 +6,52 @@ This module predicts faculty stress levels based on workload factors.
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, precision_score, recall_score, f1_score
 import pickle
+import hashlib
 import os
+import threading
+
+try:
+    from .wss import FEATURE_NAMES, LOW_MAX, MEDIUM_MAX, wss_scores, stress_levels
+    from .validation import resolve_columns, validate_records, write_quarantine, DEFAULT_QUARANTINE_FILE
+    from .drift import DriftMonitor
+    from .model_backends import DEFAULT_BACKEND, make_model, fit_model, model_backend
+    from .training_data import WEIGHT_COLUMN, collapse_duplicates, balanced_weights
+    from .training_data import summarize_training_file, DEFAULT_CHUNK_ROWS, DEFAULT_RESERVOIR_SIZE
+except ImportError:
+    from wss import FEATURE_NAMES, LOW_MAX, MEDIUM_MAX, wss_scores, stress_levels
+    from validation import resolve_columns, validate_records, write_quarantine, DEFAULT_QUARANTINE_FILE
+    from drift import DriftMonitor
+    from model_backends import DEFAULT_BACKEND, make_model, fit_model, model_backend
+    from training_data import WEIGHT_COLUMN, collapse_duplicates, balanced_weights
+    from training_data import summarize_training_file, DEFAULT_CHUNK_ROWS, DEFAULT_RESERVOIR_SIZE
 
 
 class FacultyStressPredictor:
     """Predicts faculty stress levels using Workload Stress Score (WSS) calculation."""
     
-    def __init__(self):
+    def __init__(self, backend=DEFAULT_BACKEND, low_max=LOW_MAX, medium_max=MEDIUM_MAX):
+        """
+        Args:
+            backend: Name of the model backend used by train_model (see
+                model_backends.MODEL_BACKENDS).
+            low_max: Highest WSS scored as Low.
+            medium_max: Highest WSS scored as Medium.
+        """
+        if not low_max < medium_max:
+            raise ValueError(f"low_max ({low_max}) must be below medium_max ({medium_max})")
+        self.backend = backend
+        # WSS policy: stress level cut-offs
+        self.low_max = low_max
+        self.medium_max = medium_max
         self.model = None
-        self.feature_names = [
-            'subjects_handled', 'students_total', 'prep_hours',
-            'research_load_hours', 'committee_duties', 'admin_tasks',
-            'meeting_hours', 'sleep_hours', 'weekend_work'
-        ]
+        # Content hash of the pickled model, used to tell model versions apart
+        self.model_version = None
+        # Training-distribution histograms travel with the model artifact
+        self.drift_monitor = None
+        self._swap_lock = threading.Lock()
+        self.feature_names = list(FEATURE_NAMES)
     
     def calculate_wss(self, row):
         """
@@ -106,109 +136,221 @@ class FacultyStressPredictor:
     
     def wss_to_stress_level(self, wss):
         """Convert WSS to stress level category."""
-        if wss <= 14:
+        if wss <= self.low_max:
             return "Low"
-        elif wss <= 20:
+        elif wss <= self.medium_max:
             return "Medium"
         else:
             return "High"
     
-    def load_and_preprocess_data(self, filepath):
-        """Load dataset and preprocess it."""
+    def calculate_wss_batch(self, df):
+        """Calculate WSS for every row of a DataFrame at once (vectorized)."""
+        return wss_scores(df[self.feature_names])
+    
+    def score_batch(self, df, track_drift=True):
+        """
+        Score a whole DataFrame of faculty records.
+        Returns a DataFrame (same index as df) with 'wss' and 'stress_level',
+        plus 'model_prediction' when a model is loaded. The records are added
+        to the drift monitor unless track_drift is False.
+        """
+        # Take one reference so a concurrent swap_model cannot change the
+        # model part-way through this batch
+        model = self.model
+        if track_drift:
+            self.track_drift(df)
+        
+        wss = self.calculate_wss_batch(df)
+        results = pd.DataFrame({
+            'wss': wss,
+            'stress_level': stress_levels(wss, self.low_max, self.medium_max)
+        }, index=df.index)
+        
+        if model is not None and len(df):
+            results['model_prediction'] = model.predict(df[self.feature_names])
+        
+        return results
+    
+    def track_drift(self, df):
+        """Add records to the drift monitor's histograms (if a monitor exists)."""
+        monitor = self.drift_monitor
+        if monitor is not None:
+            monitor.update(df[self.feature_names])
+    
+    def swap_model(self, model, model_version=None, drift_reference=None):
+        """
+        Atomically replace the active model.
+        Batches already being scored finish with the model they started with;
+        batches started after the swap use the new one. The predictor's
+        backend follows the new model, so retraining and registering use it.
+        """
+        monitor = DriftMonitor(drift_reference) if drift_reference is not None else None
+        backend = model_backend(model) or self.backend
+        with self._swap_lock:
+            self.backend = backend
+            self.model = model
+            self.model_version = model_version
+            self.drift_monitor = monitor
+    
+    def active_model(self):
+        """Return a consistent (model, model_version) pair."""
+        with self._swap_lock:
+            return self.model, self.model_version
+    
+    def load_and_preprocess_data(self, filepath, keep_faculty_id=False):
+        """Load dataset and preprocess it.
+        
+        Args:
+            filepath: Path to the Excel dataset.
+            keep_faculty_id: If True, the faculty ID column is kept as
+                'faculty_id' instead of being dropped.
+        """
         try:
             # Read Excel file
             df = pd.read_excel(filepath)
             
-            # Check if we need to drop faculty_id column
-            if 'faculty_id' in df.columns:
-                df = df.drop('faculty_id', axis=1)
-            elif 'Faculty_ID' in df.columns:
-                df = df.drop('Faculty_ID', axis=1)
+            # Match columns by name (or known alias), never by position
+            column_map = resolve_columns(df.columns)
+            if any(src != dst for src, dst in column_map.items() if dst in self.feature_names):
+                print("Adjusting column names to match expected format...")
+                print(f"Expected: {self.feature_names}")
+                print(f"Found: {list(df.columns)}")
+                print("✓ Columns renamed successfully")
+            else:
+                print("✓ Column names match expected format")
+            df = df[list(column_map)].rename(columns=column_map)
             
-            # Ensure we have exactly the right columns in the right order
-            expected_cols = self.feature_names
-            actual_cols = list(df.columns)
+            # Route rows with nulls, bad types or out-of-range values to quarantine
+            df, quarantined, _ = validate_records(df)
+            if len(quarantined):
+                write_quarantine(quarantined, source=filepath)
+                print(f"Warning: {len(quarantined)} invalid record(s) quarantined to {DEFAULT_QUARANTINE_FILE}")
             
-            if actual_cols != expected_cols:
-                print(f"Adjusting column names to match expected format...")
-                print(f"Expected: {expected_cols}")
-                print(f"Found: {actual_cols}")
-                
-                # Verify we have the right number of columns
-                if len(actual_cols) == len(expected_cols):
-                    # Rename columns to match expected names
-                    df.columns = expected_cols
-                    print("✓ Columns renamed successfully")
+            if 'faculty_id' in df.columns:
+                if keep_faculty_id:
+                    df['faculty_id'] = df['faculty_id'].astype(str)
                 else:
-                    raise ValueError(f"Column count mismatch. Expected {len(expected_cols)}, got {len(actual_cols)}")
-            else:
-                print("✓ Column names match expected format")
+                    df = df.drop('faculty_id', axis=1)
             
             # Calculate WSS for each row
-            df['wss'] = df.apply(self.calculate_wss, axis=1)
+            df['wss'] = self.calculate_wss_batch(df)
             
             # Convert WSS to stress level
-            df['stress_level'] = df['wss'].apply(self.wss_to_stress_level)
+            df['stress_level'] = stress_levels(df['wss'], self.low_max, self.medium_max)
             
             return df
         except Exception as e:
             print(f"Error loading data: {e}")
             return None
     
-    def train_model(self, df):
-        """Train a Random Forest model for stress prediction."""
+    def train_model(self, df, deduplicate=False):
+        """Train the configured model backend for stress prediction.
+        
+        Args:
+            df: Training records with the nine features and 'stress_level'.
+            deduplicate: If True, identical (features, stress_level) rows are
+                collapsed into unique rows weighted by their count, and the
+                split, training and evaluation all use those weights. An
+                existing 'sample_weight' column is treated as row counts.
+        """
+        weights = None
+        if deduplicate:
+            existing = WEIGHT_COLUMN if WEIGHT_COLUMN in df.columns else None
+            total_rows = round(df[existing].sum()) if existing else len(df)
+            df = collapse_duplicates(df, self.feature_names, weight=existing)
+            weights = df[WEIGHT_COLUMN]
+            print(f"Collapsed {total_rows} rows into {len(df)} unique profiles")
+        
         # Prepare features and target
         X = df[self.feature_names]
         y = df['stress_level']
         
         # Check class distribution
         class_counts = y.value_counts()
-        print(f"Class distribution: {dict(class_counts)}")
+        if weights is None:
+            print(f"Class distribution: {dict(class_counts)}")
+        else:
+            print(f"Class distribution: {dict(weights.groupby(y).sum().round().astype(int))}")
         
         # Adjust test size based on smallest class
         min_class_size = class_counts.min()
         test_size = max(0.15, min(0.3, min_class_size / len(df)))  # Ensure at least 1 sample per class in test
         
-        # Split data with stratification
+        # Split data with stratification (weights, if any, follow their rows)
+        arrays = [X, y] if weights is None else [X, y, weights]
         try:
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=test_size, random_state=42, stratify=y
+            parts = train_test_split(
+                *arrays, test_size=test_size, random_state=42, stratify=y
             )
         except ValueError:
             # If stratification fails, use regular split
             print("Warning: Stratification failed, using regular split")
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=test_size, random_state=42
+            parts = train_test_split(
+                *arrays, test_size=test_size, random_state=42
             )
+        X_train, X_test, y_train, y_test = parts[:4]
+        w_train, w_test = parts[4:] if weights is not None else (None, None)
         
         # Store test data for evaluation
         self.X_test = X_test
         self.y_test = y_test
         self.X_train = X_train
         self.y_train = y_train
+        self.w_train = w_train
+        self.w_test = w_test
         
-        # Train Random Forest Classifier with balanced parameters
-        self.model = RandomForestClassifier(
-            n_estimators=200, 
-            random_state=42,
-            class_weight='balanced',  # Handle class imbalance
-            max_depth=10,
-            min_samples_split=5,
-            min_samples_leaf=2
-        )
-        self.model.fit(X_train, y_train)
+        # Train the selected backend with balanced class weights
+        if weights is None:
+            self.model = make_model(self.backend)
+            self.model.fit(X_train, y_train)
+        else:
+            # Balance classes by their weighted totals, not unique-row counts
+            self.model = make_model(self.backend, class_weight=None)
+            fit_model(self.model, X_train, y_train, balanced_weights(y_train, w_train))
+        self.drift_monitor = DriftMonitor.from_frame(X_train, weights=w_train)
+        self.model_version = model_digest(self.artifact_bytes())
         
         # Evaluate
         y_pred = self.model.predict(X_test)
-        accuracy = accuracy_score(y_test, y_pred)
+        accuracy = accuracy_score(y_test, y_pred, sample_weight=w_test)
         
         print(f"Model Accuracy: {accuracy:.2%}")
-        print(f"Training samples: {len(X_train)}, Test samples: {len(X_test)}")
+        if weights is None:
+            print(f"Training samples: {len(X_train)}, Test samples: {len(X_test)}")
+        else:
+            print(f"Training samples: {round(w_train.sum())} ({len(X_train)} unique), "
+                  f"Test samples: {round(w_test.sum())} ({len(X_test)} unique)")
         print("\nClassification Report:")
-        print(classification_report(y_test, y_pred, zero_division=0))
+        print(classification_report(y_test, y_pred, sample_weight=w_test, zero_division=0))
         
         return self.model
     
+    def train_model_streaming(self, filepath, method='counts', chunksize=DEFAULT_CHUNK_ROWS,
+                              per_class=DEFAULT_RESERVOIR_SIZE, seed=42):
+        """Train from a dataset file that does not fit in memory.
+        
+        The file is read in chunks, labelled with this predictor's WSS
+        cut-offs and reduced to a weighted summary (exact per-tuple counts,
+        or a per-class reservoir sample), which is then trained on as in
+        train_model(deduplicate=True).
+        
+        Args:
+            filepath: CSV dataset (streamed) or Excel dataset.
+            method: 'counts' or 'reservoir' (see summarize_training_file).
+            chunksize: Rows read per chunk.
+            per_class: Reservoir size per stress level.
+            seed: Random seed of the reservoir.
+        """
+        summary, stats = summarize_training_file(filepath, method, chunksize, per_class, seed,
+                                                 low_max=self.low_max, medium_max=self.medium_max)
+        print(f"Streamed {stats['rows']} rows in {stats['chunks']} chunk(s) "
+              f"into {stats['summary_rows']} summary rows ({method})")
+        if stats['quarantined']:
+            print(f"Warning: {stats['quarantined']} invalid record(s) quarantined to {DEFAULT_QUARANTINE_FILE}")
+        if summary.empty:
+            raise ValueError(f"No valid training records in {filepath}")
+        return self.train_model(summary, deduplicate=True)
+    
     def evaluate_model_performance(self, df=None):
         """Evaluate model performance and return metrics including confusion matrix.
         
@@ -247,31 +389,37 @@ class FacultyStressPredictor:
             self.y_test = y_test
             self.X_train = X_train
             self.y_train = y_train
+            self.w_train = None
+            self.w_test = None
+        
+        # Row weights when trained on deduplicated profiles
+        w_test = getattr(self, 'w_test', None)
+        w_train = getattr(self, 'w_train', None)
         
         # Get predictions
         y_pred = self.model.predict(self.X_test)
         y_train_pred = self.model.predict(self.X_train)
         
         # Calculate metrics
-        test_accuracy = accuracy_score(self.y_test, y_pred)
-        train_accuracy = accuracy_score(self.y_train, y_train_pred)
+        test_accuracy = accuracy_score(self.y_test, y_pred, sample_weight=w_test)
+        train_accuracy = accuracy_score(self.y_train, y_train_pred, sample_weight=w_train)
         
         # Get unique classes in order
         classes = sorted(list(set(list(self.y_test) + list(y_pred))))
         
         # Confusion matrix
-        cm = confusion_matrix(self.y_test, y_pred, labels=classes)
+        cm = confusion_matrix(self.y_test, y_pred, labels=classes, sample_weight=w_test)
         
         # Per-class metrics
-        precision = precision_score(self.y_test, y_pred, labels=classes, average=None, zero_division=0)
-        recall = recall_score(self.y_test, y_pred, labels=classes, average=None, zero_division=0)
-        f1 = f1_score(self.y_test, y_pred, labels=classes, average=None, zero_division=0)
+        precision = precision_score(self.y_test, y_pred, labels=classes, average=None, sample_weight=w_test, zero_division=0)
+        recall = recall_score(self.y_test, y_pred, labels=classes, average=None, sample_weight=w_test, zero_division=0)
+        f1 = f1_score(self.y_test, y_pred, labels=classes, average=None, sample_weight=w_test, zero_division=0)
         
         # Overall metrics
-        macro_precision = precision_score(self.y_test, y_pred, average='macro', zero_division=0)
-        macro_recall = recall_score(self.y_test, y_pred, average='macro', zero_division=0)
-        macro_f1 = f1_score(self.y_test, y_pred, average='macro', zero_division=0)
-        weighted_f1 = f1_score(self.y_test, y_pred, average='weighted', zero_division=0)
+        macro_precision = precision_score(self.y_test, y_pred, average='macro', sample_weight=w_test, zero_division=0)
+        macro_recall = recall_score(self.y_test, y_pred, average='macro', sample_weight=w_test, zero_division=0)
+        macro_f1 = f1_score(self.y_test, y_pred, average='macro', sample_weight=w_test, zero_division=0)
+        weighted_f1 = f1_score(self.y_test, y_pred, average='weighted', sample_weight=w_test, zero_division=0)
         
         return {
             'test_accuracy': test_accuracy,
@@ -285,8 +433,8 @@ class FacultyStressPredictor:
             'macro_recall': macro_recall,
             'macro_f1': macro_f1,
             'weighted_f1': weighted_f1,
-            'test_samples': len(self.y_test),
-            'train_samples': len(self.y_train)
+            'test_samples': round(w_test.sum()) if w_test is not None else len(self.y_test),
+            'train_samples': round(w_train.sum()) if w_train is not None else len(self.y_train)
         }
     
     def predict_stress(self, faculty_data):
@@ -309,9 +457,12 @@ class FacultyStressPredictor:
         # Get stress level
         stress_level = self.wss_to_stress_level(wss)
         
+        self.track_drift(df_input)
+        
         # Also use model prediction if available
-        if self.model:
-            model_prediction = self.model.predict(df_input)[0]
+        model = self.model
+        if model:
+            model_prediction = model.predict(df_input)[0]
             return {
                 'wss': int(wss),
                 'stress_level': stress_level,
@@ -323,24 +474,51 @@ class FacultyStressPredictor:
                 'stress_level': stress_level
             }
     
+    def artifact_bytes(self):
+        """Return the pickled model artifact (model plus drift reference)."""
+        monitor = self.drift_monitor
+        return pickle.dumps({
+            'model': self.model,
+            'drift_reference': monitor.reference if monitor is not None else None
+        })
+    
     def save_model(self, filepath='ml_component/stress_model.pkl'):
         """Save the trained model."""
         if self.model:
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            data = self.artifact_bytes()
             with open(filepath, 'wb') as f:
-                pickle.dump(self.model, f)
+                f.write(data)
+            self.model_version = model_digest(data)
             print(f"Model saved to {filepath}")
     
     def load_model(self, filepath='ml_component/stress_model.pkl'):
         """Load a trained model."""
         if os.path.exists(filepath):
             with open(filepath, 'rb') as f:
-                self.model = pickle.load(f)
+                data = f.read()
+            model, drift_reference = unpack_artifact(pickle.loads(data))
+            self.swap_model(model, model_digest(data), drift_reference)
             print(f"Model loaded from {filepath}")
             # Note: Test data not available when loading from file
             # User needs to retrain or load dataset to evaluate performance
 
 
+def unpack_artifact(artifact):
+    """
+    Split a loaded artifact into (model, drift_reference).
+    Older artifacts are a bare model with no drift reference.
+    """
+    if isinstance(artifact, dict) and 'model' in artifact:
+        return artifact['model'], artifact.get('drift_reference')
+    return artifact, None
+
+
+def model_digest(data):
+    """Return a short content hash identifying a pickled model."""
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
 def write_stress_output(stress_level, output_file='integration/stress_output.txt'):
     """Write stress level prediction to output file for Prolog system."""
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
@@ -0,0 +1,238 @@
+"""
+Multi-tenant predictor pool.
+Serves many institutions from one process: each tenant has its own model
+registry and WSS policy (stress level cut-offs), loaded on demand into an
+LRU cache bounded by the memory of the cached models.
+
+Layout:
+    <root>/<tenant_id>/policy.json    {"low_max": 14, "medium_max": 20, "backend": ...}
+    <root>/<tenant_id>/registry/      ModelRegistry of the tenant's models
+
+A tenant without a promoted model is scored on its WSS policy alone.
+"""
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .wss import LOW_MAX, MEDIUM_MAX
+    from .stress_predictor import FacultyStressPredictor
+    from .model_registry import ModelRegistry
+except ImportError:
+    from wss import LOW_MAX, MEDIUM_MAX
+    from stress_predictor import FacultyStressPredictor
+    from model_registry import ModelRegistry
+
+
+DEFAULT_TENANTS_DIR = 'ml_component/tenants'
+DEFAULT_MAX_BYTES = 512 * 2**20
+DEFAULT_POLICY = {'low_max': LOW_MAX, 'medium_max': MEDIUM_MAX}
+
+
+def _tenant_id_ok(tenant_id):
+    return bool(tenant_id) and os.path.basename(tenant_id) == tenant_id \
+        and not tenant_id.startswith('.')
+
+
+class TenantPool:
+    """LRU cache of per-tenant predictors, bounded by model memory."""
+
+    def __init__(self, root=DEFAULT_TENANTS_DIR, max_bytes=DEFAULT_MAX_BYTES, loader=None):
+        """
+        Args:
+            root: Directory holding one sub-directory per tenant.
+            max_bytes: Upper bound on the (pickled) size of cached models;
+                least recently used tenants are evicted beyond it. The most
+                recently used tenant is always kept.
+            loader: Optional callable tenant_id -> FacultyStressPredictor
+                replacing the directory-based load_tenant(). The size of
+                its models is measured by pickling them; load_tenant()
+                takes it from the registry metadata instead.
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self._cache = OrderedDict()  # tenant_id -> (predictor, size in bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loading = {}
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'load_seconds': 0.0}
+
+    def tenant_dir(self, tenant_id):
+        if not _tenant_id_ok(str(tenant_id)):
+            raise ValueError(f"Invalid tenant ID: {tenant_id!r}")
+        return os.path.join(self.root, str(tenant_id))
+
+    def tenants(self):
+        """Return the IDs of all configured tenants."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if _tenant_id_ok(name) and os.path.isdir(os.path.join(self.root, name)))
+
+    def policy(self, tenant_id):
+        """Return the tenant's policy (defaults for anything not set)."""
+        path = os.path.join(self.tenant_dir(tenant_id), 'policy.json')
+        policy = dict(DEFAULT_POLICY)
+        if os.path.exists(path):
+            with open(path) as f:
+                policy.update(json.load(f))
+        return policy
+
+    def save_policy(self, tenant_id, **policy):
+        """Create or update a tenant's policy file."""
+        directory = self.tenant_dir(tenant_id)
+        os.makedirs(directory, exist_ok=True)
+        merged = self.policy(tenant_id)
+        merged.update(policy)
+        with open(os.path.join(directory, 'policy.json'), 'w') as f:
+            json.dump(merged, f, indent=2)
+        self.invalidate(tenant_id)
+
+    def registry(self, tenant_id):
+        """Return the tenant's model registry."""
+        return ModelRegistry(os.path.join(self.tenant_dir(tenant_id), 'registry'))
+
+    def load_tenant(self, tenant_id):
+        """Build a predictor from the tenant's policy and promoted model."""
+        return self._load_tenant(tenant_id)[0]
+
+    def _load_tenant(self, tenant_id):
+        """load_tenant(), also returning the model's artifact size in bytes."""
+        directory = self.tenant_dir(tenant_id)
+        if not os.path.isdir(directory):
+            raise ValueError(f"Unknown tenant: {tenant_id}")
+        policy = self.policy(tenant_id)
+        kwargs = {'low_max': policy['low_max'], 'medium_max': policy['medium_max']}
+        if 'backend' in policy:
+            kwargs['backend'] = policy['backend']
+        predictor = FacultyStressPredictor(**kwargs)
+        registry = self.registry(tenant_id)
+        if not registry.current_version():
+            return predictor, 0
+        info = registry.hot_swap(predictor)
+        return predictor, info['artifact_bytes']
+
+    def _load(self, tenant_id):
+        """Load a tenant's predictor; returns (predictor, size in bytes)."""
+        if self.loader is None:
+            return self._load_tenant(tenant_id)
+        predictor = self.loader(tenant_id)
+        return predictor, len(predictor.artifact_bytes()) if predictor.model is not None else 0
+
+    def _evict(self):
+        """Drop least recently used tenants until within max_bytes."""
+        while self._bytes > self.max_bytes and len(self._cache) > 1:
+            _, (_, size) = self._cache.popitem(last=False)
+            self._bytes -= size
+            self.stats['evictions'] += 1
+
+    def get(self, tenant_id):
+        """Return the tenant's predictor, loading it on a cache miss."""
+        with self._lock:
+            entry = self._cache.get(tenant_id)
+            if entry is not None:
+                self._cache.move_to_end(tenant_id)
+                self.stats['hits'] += 1
+                return entry[0]
+            self.stats['misses'] += 1
+            # One load per tenant; other tenants' hits are not blocked
+            loading = self._loading.setdefault(tenant_id, threading.Lock())
+
+        with loading:
+            with self._lock:
+                entry = self._cache.get(tenant_id)
+                if entry is not None:
+                    self._cache.move_to_end(tenant_id)
+                    return entry[0]
+            start = time.perf_counter()
+            try:
+                predictor, size = self._load(tenant_id)
+            except Exception:
+                with self._lock:
+                    self._loading.pop(tenant_id, None)
+                raise
+            with self._lock:
+                self.stats['load_seconds'] += time.perf_counter() - start
+                self._cache[tenant_id] = (predictor, size)
+                self._bytes += size
+                self._evict()
+                self._loading.pop(tenant_id, None)
+            return predictor
+
+    def invalidate(self, tenant_id):
+        """Drop a tenant from the cache (e.g. after its policy or model changed)."""
+        with self._lock:
+            entry = self._cache.pop(tenant_id, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def predict(self, tenant_id, faculty_data):
+        """Predict stress for one faculty member of a tenant."""
+        return self.get(tenant_id).predict_stress(faculty_data)
+
+    def score_batch(self, df, tenant_column='tenant_id'):
+        """
+        Score rows of many tenants at once.
+
+        Rows are grouped by tenant and each group is scored in a single
+        vectorized call with that tenant's predictor.
+
+        Returns:
+            DataFrame (same index as df) with 'tenant_id', 'wss',
+            'stress_level' and 'model_prediction' (None for tenants
+            without a model).
+        """
+        if tenant_column not in df.columns:
+            raise ValueError(f"Missing tenant column: {tenant_column}")
+        codes, tenant_ids = pd.factorize(df[tenant_column])
+        if (codes < 0).any():
+            raise ValueError(f"{int((codes < 0).sum())} row(s) have no tenant ID")
+
+        # Stable sort so each tenant's rows form one contiguous block
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(tenant_ids) + 1))
+
+        # Score tenants already in the cache first, so loading the others
+        # cannot evict a tenant this batch still needs
+        with self._lock:
+            resident = set(self._cache)
+        tenant_order = sorted(range(len(tenant_ids)), key=lambda i: tenant_ids[i] not in resident)
+
+        wss = np.zeros(len(df), dtype=np.int16)
+        levels = np.empty(len(df), dtype=object)
+        predictions = np.full(len(df), None, dtype=object)
+        for i in tenant_order:
+            tenant_id = tenant_ids[i]
+            rows = order[bounds[i]:bounds[i + 1]]
+            scores = self.get(tenant_id).score_batch(df.iloc[rows])
+            wss[rows] = scores['wss'].to_numpy()
+            levels[rows] = scores['stress_level'].to_numpy()
+            if 'model_prediction' in scores.columns:
+                predictions[rows] = scores['model_prediction'].to_numpy()
+
+        return pd.DataFrame({
+            'tenant_id': df[tenant_column].to_numpy(),
+            'wss': wss,
+            'stress_level': levels,
+            'model_prediction': predictions,
+        }, index=df.index)
+
+    def cache_stats(self):
+        """
+        Return cache statistics: hits, misses, hit_rate, evictions,
+        load_seconds, resident tenants and resident_bytes.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['resident'] = list(self._cache)
+            stats['resident_bytes'] = self._bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,248 @@
+"""
+Training data preparation.
+Collapses repeated (feature tuple, label) rows into unique rows with a
+'sample_weight' count, so training time and memory follow the number of
+distinct workload profiles rather than the raw row count, and summarizes
+datasets too large for memory by streaming them in chunks into exact
+per-tuple counts or a per-class reservoir sample.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .wss import FEATURE_NAMES, LOW_MAX, MEDIUM_MAX, wss_scores, stress_levels
+    from .validation import resolve_columns, validate_records, write_quarantine, DEFAULT_QUARANTINE_FILE
+except ImportError:
+    from wss import FEATURE_NAMES, LOW_MAX, MEDIUM_MAX, wss_scores, stress_levels
+    from validation import resolve_columns, validate_records, write_quarantine, DEFAULT_QUARANTINE_FILE
+
+
+WEIGHT_COLUMN = 'sample_weight'
+
+DEFAULT_CHUNK_ROWS = 250_000
+DEFAULT_RESERVOIR_SIZE = 50_000
+SUMMARY_METHODS = ['counts', 'reservoir']
+
+
+def collapse_duplicates(df, feature_names=FEATURE_NAMES, label='stress_level', weight=None):
+    """
+    Collapse identical (features, label) rows.
+
+    Args:
+        df: Records with the feature columns and the label column.
+        feature_names: Feature columns to group on.
+        label: Label column.
+        weight: Optional existing weight column to sum instead of counting
+            rows (e.g. when merging already collapsed chunks).
+
+    Returns:
+        DataFrame with one row per distinct (features, label) combination,
+        the feature and label columns plus WEIGHT_COLUMN.
+    """
+    cols = list(feature_names) + [label]
+    if len(df) == 0:
+        return pd.DataFrame({**{c: df[c] for c in cols}, WEIGHT_COLUMN: pd.Series(dtype=np.float64)})
+
+    # Pack every row into one int64 key (mixed radix over factorized columns)
+    # so duplicates are found with a single 1-D sort
+    key = np.zeros(len(df), dtype=np.int64)
+    radix = 1
+    for col in cols:
+        codes, uniques = pd.factorize(df[col], sort=False, use_na_sentinel=False)
+        radix *= max(len(uniques), 1)
+        if radix >= 2**62:
+            return _collapse_with_groupby(df, cols, weight)
+        key = key * len(uniques) + codes
+
+    _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+    weights = df[weight].to_numpy(dtype=np.float64) if weight else None
+    counts = np.bincount(inverse.ravel(), weights=weights, minlength=len(first))
+
+    collapsed = df[cols].iloc[first].reset_index(drop=True)
+    collapsed[WEIGHT_COLUMN] = counts.astype(np.float64)
+    return collapsed
+
+
+def _collapse_with_groupby(df, cols, weight):
+    """Fallback for very high-cardinality inputs."""
+    if weight:
+        grouped = df.groupby(cols, sort=False, observed=True, dropna=False)[weight].sum()
+    else:
+        grouped = df.groupby(cols, sort=False, observed=True, dropna=False).size()
+    return grouped.astype(np.float64).rename(WEIGHT_COLUMN).reset_index()
+
+
+def balanced_weights(y, sample_weight):
+    """
+    Multiply sample weights by 'balanced' class weights computed from the
+    weighted class totals (what class_weight='balanced' does for raw rows).
+    """
+    y = np.asarray(y)
+    sample_weight = np.asarray(sample_weight, dtype=np.float64)
+    classes, inverse = np.unique(y, return_inverse=True)
+    totals = np.bincount(inverse, weights=sample_weight)
+    factors = sample_weight.sum() / (len(classes) * totals)
+    return sample_weight * factors[inverse]
+
+
+class TupleCounts:
+    """
+    Exact counts of every distinct (features, label) row seen so far.
+    Memory follows the number of distinct profiles, not the rows streamed.
+    """
+
+    def __init__(self, feature_names=FEATURE_NAMES, merge_rows=1_000_000):
+        self.feature_names = list(feature_names)
+        self.merge_rows = merge_rows
+        self.summary = None
+        self._pending = []
+        self._pending_rows = 0
+
+    def add(self, chunk):
+        """Count the rows of a labelled chunk."""
+        collapsed = collapse_duplicates(chunk, self.feature_names)
+        self._pending.append(collapsed)
+        self._pending_rows += len(collapsed)
+        if self._pending_rows >= self.merge_rows:
+            self._merge()
+
+    def _merge(self):
+        parts = ([self.summary] if self.summary is not None else []) + self._pending
+        if parts:
+            self.summary = collapse_duplicates(
+                pd.concat(parts, ignore_index=True), self.feature_names, weight=WEIGHT_COLUMN
+            )
+        self._pending = []
+        self._pending_rows = 0
+
+    def result(self):
+        """Return the unique rows with their WEIGHT_COLUMN counts."""
+        self._merge()
+        return self.summary
+
+
+class StratifiedReservoir:
+    """
+    A uniform random sample of at most per_class rows of each stress level
+    (reservoir sampling, Algorithm R), in fixed memory however many rows
+    are streamed.
+    """
+
+    def __init__(self, per_class=DEFAULT_RESERVOIR_SIZE, feature_names=FEATURE_NAMES, seed=42):
+        self.per_class = per_class
+        self.feature_names = list(feature_names)
+        self.rng = np.random.default_rng(seed)
+        self.samples = {}
+        self.seen = {}
+
+    def add(self, chunk, label='stress_level'):
+        """Offer the rows of a labelled chunk to the per-class reservoirs."""
+        labels = chunk[label].to_numpy()
+        X = chunk[self.feature_names].to_numpy(dtype=np.int16)
+        for cls in pd.unique(labels):
+            self._add_class(cls, X[labels == cls])
+
+    def _add_class(self, cls, rows):
+        k = self.per_class
+        sample = self.samples.setdefault(cls, np.empty((k, len(self.feature_names)), dtype=np.int16))
+        seen = self.seen.get(cls, 0)
+
+        # Row number t fills slot t while the reservoir is filling; after
+        # that it replaces a random slot with probability k / (t + 1)
+        t = seen + np.arange(len(rows), dtype=np.int64)
+        slots = np.where(t < k, t, (self.rng.random(len(rows)) * (t + 1)).astype(np.int64))
+        taken = np.flatnonzero(slots < k)
+        slots = slots[taken]
+
+        # When several rows of one chunk hit the same slot the last one wins
+        _, last = np.unique(slots[::-1], return_index=True)
+        last = len(slots) - 1 - last
+        sample[slots[last]] = rows[taken[last]]
+        self.seen[cls] = seen + len(rows)
+
+    def result(self):
+        """
+        Return the sampled rows with WEIGHT_COLUMN set to the number of rows
+        each one stands for, so weighted class totals match the stream.
+        """
+        frames = []
+        for cls, sample in self.samples.items():
+            kept = min(self.seen[cls], self.per_class)
+            frame = pd.DataFrame(sample[:kept], columns=self.feature_names)
+            frame['stress_level'] = cls
+            frame[WEIGHT_COLUMN] = self.seen[cls] / kept
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=self.feature_names + ['stress_level', WEIGHT_COLUMN])
+        return pd.concat(frames, ignore_index=True)
+
+
+def read_chunks(filepath, chunksize=DEFAULT_CHUNK_ROWS):
+    """
+    Yield a dataset file as DataFrame chunks.
+    CSV files (optionally compressed) are streamed; Excel files cannot be
+    read incrementally and are yielded as a single chunk.
+    """
+    if str(filepath).lower().endswith(('.xlsx', '.xls')):
+        yield pd.read_excel(filepath)
+        return
+    yield from pd.read_csv(filepath, chunksize=chunksize)
+
+
+def summarize_training_file(filepath, method='counts', chunksize=DEFAULT_CHUNK_ROWS,
+                            per_class=DEFAULT_RESERVOIR_SIZE, seed=42,
+                            quarantine_file=DEFAULT_QUARANTINE_FILE,
+                            low_max=LOW_MAX, medium_max=MEDIUM_MAX):
+    """
+    Stream a dataset file into a weighted training summary.
+
+    Each chunk is validated (invalid rows are quarantined), labelled with
+    its WSS stress level and folded into the summary, so only one chunk and
+    the summary are held in memory.
+
+    Args:
+        filepath: CSV (streamed) or Excel dataset.
+        method: 'counts' for exact per-tuple counts, or 'reservoir' for a
+            per-class reservoir sample of per_class rows.
+        chunksize: Rows read per chunk.
+        per_class: Reservoir size per stress level.
+        seed: Random seed of the reservoir.
+        quarantine_file: Where invalid rows are appended.
+        low_max, medium_max: WSS cut-offs used to label the rows (pass the
+            predictor's, so the summary matches its policy).
+
+    Returns:
+        (summary, stats): the summary rows (features, 'stress_level',
+        WEIGHT_COLUMN) ready for train_model(deduplicate=True), and a dict
+        with 'rows', 'quarantined', 'chunks' and 'summary_rows'.
+    """
+    if method == 'counts':
+        accumulator = TupleCounts()
+    elif method == 'reservoir':
+        accumulator = StratifiedReservoir(per_class, seed=seed)
+    else:
+        raise ValueError(f"Unknown summary method: {method}. Choose from {SUMMARY_METHODS}")
+
+    stats = {'rows': 0, 'quarantined': 0, 'chunks': 0}
+    column_map = None
+    for chunk in read_chunks(filepath, chunksize):
+        if column_map is None:
+            column_map = {src: dst for src, dst in resolve_columns(chunk.columns).items()
+                          if dst in FEATURE_NAMES}
+        chunk = chunk[list(column_map)].rename(columns=column_map)
+        valid, quarantined, _ = validate_records(chunk)
+        if len(quarantined):
+            write_quarantine(quarantined, source=filepath, output_file=quarantine_file)
+
+        features = valid[FEATURE_NAMES].astype(np.int16)
+        features['stress_level'] = stress_levels(wss_scores(features), low_max, medium_max)
+        accumulator.add(features)
+
+        stats['rows'] += len(chunk)
+        stats['quarantined'] += len(quarantined)
+        stats['chunks'] += 1
+
+    summary = accumulator.result()
+    stats['summary_rows'] = len(summary)
+    return summary, stats
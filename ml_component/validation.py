@@ -0,0 +1,183 @@
+"""
+Input validation for faculty workload records.
+Resolves column names by name (with known aliases) instead of by position,
+then checks nulls, dtypes and per-feature ranges with whole-column mask
+operations. Rows that fail are routed to a quarantine file with reason codes
+while valid rows continue through the pipeline.
+"""
+
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .wss import FEATURE_NAMES, FEATURE_RANGES
+except ImportError:
+    from wss import FEATURE_NAMES, FEATURE_RANGES
+
+
+DEFAULT_QUARANTINE_FILE = 'integration/quarantine.csv'
+
+# Alternative column names seen in exports (see generate_dataset.py)
+COLUMN_ALIASES = {
+    'total_students': 'students_total',
+    'students': 'students_total',
+    'preparation_hours': 'prep_hours',
+    'research_load': 'research_load_hours',
+    'research_hours': 'research_load_hours',
+    'committees': 'committee_duties',
+    'administrative_tasks': 'admin_tasks',
+    'meetings': 'meeting_hours',
+    'sleep': 'sleep_hours',
+    'weekend_work_frequency': 'weekend_work',
+}
+
+# Non-feature columns carried through validation unchanged
+PASSTHROUGH_COLUMNS = ['faculty_id', 'department']
+
+QUARANTINE_COLUMNS = ['quarantined_at', 'source', 'source_row', 'faculty_id'] \
+    + FEATURE_NAMES + ['reason_codes']
+
+# Reason codes; each feature uses one bit per check
+REASONS = ['MISSING', 'NOT_NUMERIC', 'NOT_INTEGER', 'OUT_OF_RANGE']
+_BITS_PER_FEATURE = len(REASONS)
+
+
+def _normalize(name):
+    return str(name).strip().lower().replace(' ', '_').replace('-', '_')
+
+
+def resolve_columns(columns):
+    """
+    Map input column names to the expected feature names.
+
+    Returns:
+        Dict of input name -> canonical name for every recognised feature
+        or pass-through column; other columns are left out.
+
+    Raises:
+        ValueError: If any expected feature column cannot be found.
+    """
+    mapping = {}
+    for col in columns:
+        key = _normalize(col)
+        if key in FEATURE_NAMES or key in PASSTHROUGH_COLUMNS:
+            canonical = key
+        else:
+            canonical = COLUMN_ALIASES.get(key)
+        if canonical and canonical not in mapping.values():
+            mapping[col] = canonical
+
+    missing = [name for name in FEATURE_NAMES if name not in mapping.values()]
+    if missing:
+        raise ValueError(f"Missing required column(s): {missing}. Found: {list(columns)}")
+    return mapping
+
+
+def reason_codes(codes):
+    """Decode reason bitmasks to strings like 'sleep_hours:OUT_OF_RANGE'."""
+    codes = np.asarray(codes, dtype=np.int64)
+    text = np.full(len(codes), '', dtype=object)
+    for i, name in enumerate(FEATURE_NAMES):
+        for j, reason in enumerate(REASONS):
+            hit = (codes >> (i * _BITS_PER_FEATURE + j)) & 1 == 1
+            if hit.any():
+                text[hit] = text[hit] + f"{name}:{reason};"
+    return pd.Series(text, dtype=object).str.rstrip(';').to_numpy()
+
+
+def _reason_bits(df, clean, rows, ranges):
+    """Compute the reason bitmask for the (few) failing rows only."""
+    codes = np.zeros(int(rows.sum()), dtype=np.int64)
+    for i, name in enumerate(FEATURE_NAMES):
+        shift = i * _BITS_PER_FEATURE
+        missing = df[name].isna().to_numpy()[rows]
+        values = np.asarray(clean[name][rows], dtype=np.float64)
+        not_numeric = np.isnan(values) & ~missing
+        not_integer = ~np.isnan(values) & (values != np.floor(values))
+        low, high = ranges[name]
+        out_of_range = (values < low) | (values > high)
+        for j, hit in enumerate([missing, not_numeric, not_integer, out_of_range]):
+            codes |= hit.astype(np.int64) << (shift + j)
+    return codes
+
+
+def validate_records(df, ranges=FEATURE_RANGES):
+    """
+    Validate the nine feature columns of df (already named canonically).
+
+    A single boolean "bad row" mask is built with whole-column comparisons;
+    reason codes are only decoded for the rows that failed.
+
+    Returns:
+        (valid, quarantined, codes): valid rows with int64 feature columns,
+        the failing rows as given plus 'reason_codes', and the per-row
+        reason bitmask (0 = valid) for all of df.
+    """
+    bad = np.zeros(len(df), dtype=bool)
+    clean = {}
+
+    for name in FEATURE_NAMES:
+        col = df[name]
+        if pd.api.types.is_integer_dtype(col) and not col.hasnans:
+            # Fast path: nothing can be missing, non-numeric or fractional
+            values = col.to_numpy()
+        else:
+            values = pd.to_numeric(col, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            # NaN (missing or non-numeric) never equals its floor
+            bad |= values != np.floor(values)
+
+        low, high = ranges[name]
+        bad |= (values < low) | (values > high)
+        clean[name] = values
+
+    codes = np.zeros(len(df), dtype=np.int64)
+    if not bad.any():
+        valid = df.copy(deep=False)
+        for name in FEATURE_NAMES:
+            if clean[name].dtype != np.int64:
+                valid[name] = clean[name].astype(np.int64)
+        return valid, df.iloc[:0].assign(reason_codes=''), codes
+
+    codes[bad] = _reason_bits(df, clean, bad, ranges)
+    ok = ~bad
+    valid = df.loc[ok].copy(deep=False)
+    for name in FEATURE_NAMES:
+        if clean[name].dtype != np.int64:
+            valid[name] = clean[name][ok].astype(np.int64)
+
+    quarantined = df.loc[bad].copy()
+    quarantined['reason_codes'] = reason_codes(codes[bad])
+    return valid, quarantined, codes
+
+
+def prepare_records(df, ranges=FEATURE_RANGES):
+    """
+    Resolve column names and validate in one step.
+    Returns (valid, quarantined) as from validate_records.
+    """
+    df = df.rename(columns=resolve_columns(df.columns))
+    valid, quarantined, _ = validate_records(df, ranges)
+    return valid, quarantined
+
+
+def write_quarantine(quarantined, source=None, output_file=DEFAULT_QUARANTINE_FILE):
+    """
+    Append quarantined rows to the quarantine CSV with their source and
+    original row index. Returns the number of rows written.
+    """
+    if quarantined.empty:
+        return 0
+    # Fixed column set so files from differently shaped inputs still append
+    out = quarantined.reindex(columns=QUARANTINE_COLUMNS[3:])
+    out.insert(0, 'source_row', quarantined.index)
+    out.insert(0, 'source', source)
+    out.insert(0, 'quarantined_at', datetime.now(timezone.utc).isoformat())
+
+    if os.path.dirname(output_file):
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    write_header = not os.path.exists(output_file)
+    out.to_csv(output_file, mode='a', header=write_header, index=False)
+    return len(out)
@@ -0,0 +1,116 @@
+"""
+Workload Stress Score (WSS) specification - vectorized implementation.
+Scores whole columns at once so batches of millions of rows can be scored
+without per-row Python calls. The rules mirror
+FacultyStressPredictor.calculate_wss exactly.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Bump whenever the bucket rules or stress thresholds below change, so that
+# stored results scored under an older specification can be recognised.
+WSS_SPEC_VERSION = "1"
+
+FEATURE_NAMES = [
+    'subjects_handled', 'students_total', 'prep_hours',
+    'research_load_hours', 'committee_duties', 'admin_tasks',
+    'meeting_hours', 'sleep_hours', 'weekend_work'
+]
+
+STRESS_LEVELS = ["Low", "Medium", "High"]
+
+# Plausible (inclusive) value range of every feature; values outside are
+# treated as data errors rather than scored
+FEATURE_RANGES = {
+    'subjects_handled': (1, 10),
+    'students_total': (20, 300),
+    'prep_hours': (1, 20),
+    'research_load_hours': (0, 15),
+    'committee_duties': (0, 10),
+    'admin_tasks': (0, 10),
+    'meeting_hours': (0, 40),
+    'sleep_hours': (4, 10),
+    'weekend_work': (0, 10),
+}
+
+# Default WSS cut-offs: WSS <= LOW_MAX is Low, WSS <= MEDIUM_MAX is Medium
+LOW_MAX = 14
+MEDIUM_MAX = 20
+
+
+def _points(one_pt, two_pts):
+    """Map boolean masks for the 1pt and 2pt buckets to points (else 3)."""
+    return np.where(one_pt, 1, np.where(two_pts, 2, 3)).astype(np.int8)
+
+
+def feature_points(feature, values):
+    """
+    Return the 1-3 WSS points for every value of a single feature.
+    values may be a scalar, a numpy array of any shape or a pandas Series.
+    """
+    v = np.asarray(values)
+    if feature == 'subjects_handled':
+        # 1-2=1pt, 3-4=2pts, 5+=3pts
+        return _points(v <= 2, v <= 4)
+    if feature == 'students_total':
+        # <60=1, 60-100=2, >100=3
+        return _points(v < 60, v <= 100)
+    if feature == 'prep_hours':
+        # <6=1, 6-10=2, >10=3
+        return _points(v < 6, v <= 10)
+    if feature == 'research_load_hours':
+        # <4=1, 4-6=2, >6=3
+        return _points(v < 4, v <= 6)
+    if feature == 'committee_duties':
+        # 0-1=1, 2=2, 3+=3
+        return _points(v <= 1, v == 2)
+    if feature == 'admin_tasks':
+        # 0-1=1, 2-3=2, 4+=3
+        return _points(v <= 1, v <= 3)
+    if feature == 'meeting_hours':
+        # <3=1, 3-6=2, >6=3
+        return _points(v < 3, v <= 6)
+    if feature == 'sleep_hours':
+        # 7+=1, 6=2, <6=3
+        return _points(v >= 7, v == 6)
+    if feature == 'weekend_work':
+        # 0=1, 1-2=2, 3+=3
+        return _points(v == 0, v <= 2)
+    raise ValueError(f"Unknown WSS feature: {feature}")
+
+
+def factor_points(X):
+    """
+    Return an (n, 9) int8 array with the WSS points of every factor.
+    X is a DataFrame containing FEATURE_NAMES or an (n, 9) array whose
+    columns are in FEATURE_NAMES order.
+    """
+    if isinstance(X, pd.DataFrame):
+        columns = [X[name].to_numpy() for name in FEATURE_NAMES]
+    else:
+        X = np.asarray(X)
+        columns = [X[..., i] for i in range(len(FEATURE_NAMES))]
+    return np.stack(
+        [feature_points(name, col) for name, col in zip(FEATURE_NAMES, columns)],
+        axis=-1
+    )
+
+
+def wss_scores(X):
+    """Return the WSS (9-27) for every row of X as an int16 array."""
+    return factor_points(X).sum(axis=-1, dtype=np.int16)
+
+
+def stress_level_codes(wss, low_max=LOW_MAX, medium_max=MEDIUM_MAX):
+    """Return 0/1/2 codes (indexes into STRESS_LEVELS) for WSS values."""
+    wss = np.asarray(wss)
+    return ((wss > low_max).astype(np.int8) + (wss > medium_max).astype(np.int8))
+
+
+def stress_levels(wss, low_max=LOW_MAX, medium_max=MEDIUM_MAX):
+    """Return the Low/Medium/High label for every WSS value."""
+    return np.asarray(STRESS_LEVELS, dtype=object)[
+        stress_level_codes(wss, low_max, medium_max)
+    ]